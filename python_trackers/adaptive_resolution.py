@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Adaptive tracker resolution
+
+Chooses the scale the tracker runs at, per frame, from the size of the
+target and the time left in the frame budget. Large, close targets are
+tracked at a coarser scale to free up time; small, distant ones get
+more pixels when there is headroom. Scales come from a fixed ladder and
+a change has to be wanted for several frames in a row, so the tracker
+is not re-initialized on every fluctuation.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def scale_ladder(max_scale: float, min_scale: float, step: float = 0.75) -> List[float]:
+    """Return the scales from min_scale to max_scale, each ``step`` times the next.
+
+    Args:
+        max_scale: Finest scale
+        min_scale: Coarsest scale
+        step: Ratio between neighbouring scales
+
+    Returns:
+        List[float]: Scales in increasing order
+    """
+    scales = [max_scale]
+    while scales[-1] * step >= min_scale:
+        scales.append(round(scales[-1] * step, 4))
+    return sorted(scales)
+
+
+class ResolutionController:
+    """Pick the tracker scale from target size and frame-time headroom."""
+
+    def __init__(self, scales: List[float],
+                 target_fps: float = 30.0,
+                 min_target_px: int = 24,
+                 max_target_px: int = 96,
+                 hold_frames: int = 15,
+                 smoothing: float = 0.1):
+        """Initialize the controller.
+
+        Args:
+            scales: Allowed scales in increasing order
+            target_fps: Frame rate the processing time is budgeted against
+            min_target_px: Smallest target side, in tracker pixels, before scaling up
+            max_target_px: Largest target side, in tracker pixels, before scaling down
+            hold_frames: Consecutive frames a change must be wanted before it is made
+            smoothing: Weight of the newest sample in the frame time average
+        """
+        self.scales = scales
+        self.budget_ms = 1000.0 / target_fps
+        self.min_target_px = min_target_px
+        self.max_target_px = max_target_px
+        self.hold_frames = hold_frames
+        self.smoothing = smoothing
+        self.index = len(scales) - 1
+        self.frame_ms: Optional[float] = None
+        self._wanted = 0
+        self._held = 0
+
+    @property
+    def scale(self) -> float:
+        """Current tracker scale."""
+        return self.scales[self.index]
+
+    def _desired_step(self, bbox: Optional[Tuple[int, int, int, int]]) -> int:
+        """Return -1 to scale down, +1 to scale up or 0 to stay."""
+        overloaded = self.frame_ms > 0.9 * self.budget_ms
+        headroom = self.frame_ms < 0.6 * self.budget_ms
+        if bbox is None:
+            # Nothing to track: only react to the frame budget
+            return -1 if overloaded else 0
+        side = min(bbox[2], bbox[3]) * self.scale
+        if overloaded or side > self.max_target_px:
+            # Only drop a level if the target stays above the minimum size
+            if self.index > 0 and min(bbox[2], bbox[3]) * self.scales[self.index - 1] >= self.min_target_px:
+                return -1
+            return 0
+        if side < self.min_target_px and headroom:
+            return 1
+        return 0
+
+    def update(self, bbox: Optional[Tuple[int, int, int, int]], frame_ms: float) -> float:
+        """Record one frame and return the scale to use for the next one.
+
+        Args:
+            bbox: Target (x, y, w, h) in display pixels, or None when not tracking
+            frame_ms: Processing time of the frame in milliseconds
+
+        Returns:
+            float: Tracker scale for the next frame
+        """
+        if self.frame_ms is None:
+            self.frame_ms = frame_ms
+        else:
+            self.frame_ms += self.smoothing * (frame_ms - self.frame_ms)
+
+        step = self._desired_step(bbox)
+        new_index = min(max(self.index + step, 0), len(self.scales) - 1)
+        if new_index == self.index:
+            self._held = 0
+            return self.scale
+        if step != self._wanted:
+            self._wanted = step
+            self._held = 0
+        self._held += 1
+        if self._held >= self.hold_frames:
+            self.index = new_index
+            self._held = 0
+            logger.info(f"Tracker scale set to {self.scale:.2f} "
+                        f"(frame time {self.frame_ms:.1f} ms)")
+        return self.scale
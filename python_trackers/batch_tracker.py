@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Batch offline analysis
+
+Runs a tracker over many recorded videos in parallel, without a serial
+port or GUI, and writes per-frame tracks in a columnar format (NPZ, or
+Parquet when pyarrow is installed) plus a JSON throughput summary.
+
+Example:
+    python batch_tracker.py flights/ "archive/*.mp4" --bboxes boxes.json -o tracks/
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import Config, ConfigError, load_config
+from tracker_registry import TRACKERS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".avi", ".mkv", ".mov", ".mp4", ".m4v", ".mpg", ".mpeg", ".webm")
+
+BBox = Tuple[int, int, int, int]
+
+
+def find_videos(inputs: List[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted list of video files.
+
+    Args:
+        inputs: Files, directories or glob patterns
+
+    Returns:
+        List[str]: Video file paths
+    """
+    videos = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in os.listdir(item):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.add(os.path.join(item, name))
+        elif os.path.isfile(item):
+            videos.add(item)
+        else:
+            videos.update(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(videos)
+
+
+def parse_bbox(text: str) -> BBox:
+    """Parse an ``x,y,w,h`` string into a bounding box."""
+    try:
+        x, y, w, h = (int(v) for v in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected x,y,w,h, got {text!r}")
+    return (x, y, w, h)
+
+
+def load_bboxes(path: str) -> Dict[str, BBox]:
+    """Load initial bounding boxes keyed by video file name or stem.
+
+    Args:
+        path: JSON file mapping names to ``[x, y, w, h]``
+
+    Returns:
+        Dict[str, BBox]: Bounding boxes by name
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    return {name: tuple(int(v) for v in box) for name, box in data.items()}
+
+
+def bbox_for(video: str, bboxes: Dict[str, BBox], default: Optional[BBox]) -> Optional[BBox]:
+    """Return the initial bounding box for a video, if one is known."""
+    name = os.path.basename(video)
+    for key in (video, name, os.path.splitext(name)[0]):
+        if key in bboxes:
+            return bboxes[key]
+    return default
+
+
+def _init_worker() -> None:
+    """Keep each worker on a single OpenCV thread so throughput scales with processes."""
+    cv2.setNumThreads(1)
+
+
+def track_video(video: str, bbox: BBox, tracker_type: str,
+                frame_size: Tuple[int, int]) -> Dict[str, Any]:
+    """Track one target through a video file.
+
+    Args:
+        video: Path to the video file
+        bbox: Initial bounding box in frame_size coordinates
+        tracker_type: OpenCV tracker type
+        frame_size: (width, height) frames are resized to before tracking
+
+    Returns:
+        Dict[str, Any]: Per-frame columns under "tracks" and summary stats
+    """
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise IOError(f"cannot open {video}")
+
+    frame_index, timestamp_ms, success, boxes, update_ms = [], [], [], [], []
+    start = time.perf_counter()
+    try:
+        ok, frame = cap.read()
+        if not ok:
+            raise IOError(f"no frames in {video}")
+        frame = cv2.resize(frame, frame_size)
+        tracker = TRACKERS.create(tracker_type)
+        t0 = time.perf_counter()
+        tracker.init(frame, bbox)
+        init_ms = (time.perf_counter() - t0) * 1000.0
+        # Frame 0 is the init frame, so rows line up with the video's frame numbers
+        frame_index.append(0)
+        timestamp_ms.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+        success.append(True)
+        boxes.append(bbox)
+        update_ms.append(init_ms)
+
+        index = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            index += 1
+            frame = cv2.resize(frame, frame_size)
+            t0 = time.perf_counter()
+            found, box = tracker.update(frame)
+            update_ms.append((time.perf_counter() - t0) * 1000.0)
+            frame_index.append(index)
+            timestamp_ms.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+            success.append(found)
+            boxes.append(box if found else (np.nan, np.nan, np.nan, np.nan))
+    finally:
+        cap.release()
+    elapsed = time.perf_counter() - start
+
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    update_ms = np.asarray(update_ms, dtype=np.float32)
+    tracks = {
+        "frame": np.asarray(frame_index, dtype=np.int32),
+        "timestamp_ms": np.asarray(timestamp_ms, dtype=np.float64),
+        "success": np.asarray(success, dtype=bool),
+        "x": boxes[:, 0],
+        "y": boxes[:, 1],
+        "w": boxes[:, 2],
+        "h": boxes[:, 3],
+        # Row 0 holds the init time
+        "update_ms": update_ms,
+    }
+    frames = len(frame_index)
+    updates = update_ms[1:]
+    return {
+        "video": video,
+        "tracks": tracks,
+        "frames": frames,
+        "lost_frames": int(frames - tracks["success"].sum()),
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "init_ms": float(init_ms),
+        "update_ms_mean": float(updates.mean()) if len(updates) else 0.0,
+        "update_ms_p95": float(np.percentile(updates, 95)) if len(updates) else 0.0,
+    }
+
+
+def output_names(videos: List[str]) -> Dict[str, str]:
+    """Name each video's track file after its path below the videos' common directory.
+
+    ``a/clip.mp4`` and ``b/clip.mp4`` become ``a__clip.mp4`` and
+    ``b__clip.mp4``, so videos with the same stem do not overwrite each
+    other's tracks.
+
+    Args:
+        videos: Video file paths
+
+    Returns:
+        Dict[str, str]: Output name (without format extension) by video path
+
+    Raises:
+        ValueError: If two videos would still map to the same name
+    """
+    paths = {video: os.path.abspath(video) for video in videos}
+    root = os.path.commonpath([os.path.dirname(p) for p in paths.values()]) if paths else ""
+    names: Dict[str, str] = {}
+    for video, path in paths.items():
+        names[video] = os.path.relpath(path, root).replace(os.sep, "__")
+    seen: Dict[str, str] = {}
+    for video, name in names.items():
+        if name in seen:
+            raise ValueError(f"{seen[name]} and {video} would both write tracks to '{name}'")
+        seen[name] = video
+    return names
+
+
+def write_tracks(tracks: Dict[str, np.ndarray], path: str, fmt: str) -> str:
+    """Write per-frame track columns to disk.
+
+    Args:
+        tracks: Column name to array
+        path: Output path without extension
+        fmt: "npz" or "parquet"
+
+    Returns:
+        str: Path of the written file
+    """
+    if fmt == "parquet":
+        path += ".parquet"
+        pq.write_table(pa.table(tracks), path)
+    else:
+        path += ".npz"
+        np.savez_compressed(path, **tracks)
+    return path
+
+
+def _run_one(video: str, bbox: BBox, tracker_type: str, frame_size: Tuple[int, int],
+             output_path: str, fmt: str) -> Dict[str, Any]:
+    """Worker entry point: track one video and write its tracks."""
+    result = track_video(video, bbox, tracker_type, frame_size)
+    result["output"] = write_tracks(result.pop("tracks"), output_path, fmt)
+    return result
+
+
+def run_batch(jobs: List[Tuple[str, BBox]], config: Config, output_dir: str,
+              fmt: str = "npz", workers: Optional[int] = None) -> Dict[str, Any]:
+    """Track every (video, bbox) job across a process pool.
+
+    Args:
+        jobs: Videos with their initial bounding boxes
+        config: Supplies the tracker type and processing frame size
+        output_dir: Directory for per-video track files
+        fmt: "npz" or "parquet"
+        workers: Number of processes (default: CPU count)
+
+    Returns:
+        Dict[str, Any]: Per-video results and aggregate throughput
+
+    Raises:
+        ValueError: If two videos would write to the same track file
+    """
+    names = output_names([video for video, _ in jobs])
+    os.makedirs(output_dir, exist_ok=True)
+    frame_size = (config.capture.frame_width, config.capture.frame_height)
+    tracker_type = config.tracker.tracker_type
+    workers = workers or os.cpu_count() or 1
+
+    results, failures = [], []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_run_one, video, bbox, tracker_type, frame_size,
+                        os.path.join(output_dir, names[video]), fmt): video
+            for video, bbox in jobs
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"{video}: {e}")
+                failures.append({"video": video, "error": str(e)})
+                continue
+            logger.info(f"{video}: {result['frames']} frames, {result['fps']:.1f} FPS, "
+                        f"{result['lost_frames']} lost")
+            results.append(result)
+    wall = time.perf_counter() - start
+
+    total_frames = sum(r["frames"] for r in results)
+    return {
+        "tracker_type": tracker_type,
+        "frame_size": list(frame_size),
+        "workers": workers,
+        "videos": sorted(results, key=lambda r: r["video"]),
+        "failures": failures,
+        "total_frames": total_frames,
+        "wall_seconds": wall,
+        "throughput_fps": total_frames / wall if wall > 0 else 0.0,
+    }
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Batch offline tracking over recorded videos")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="video files, directories or glob patterns"
+    )
+    parser.add_argument(
+        "-b", "--bboxes",
+        type=str,
+        default=None,
+        help="JSON file mapping video name or stem to [x, y, w, h]"
+    )
+    parser.add_argument(
+        "--bbox",
+        type=parse_bbox,
+        default=None,
+        help="initial x,y,w,h for videos missing from --bboxes"
+    )
+    parser.add_argument(
+        "-c", "--config",
+        type=str,
+        default=None,
+        help="config file supplying tracker type and frame size (optional)"
+    )
+    parser.add_argument(
+        "-t", "--tracker",
+        type=str,
+        default=None,
+        choices=TRACKERS.names(),
+        help="object tracker type (default: from config, kcf)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default="tracks",
+        help="output directory (default: tracks)"
+    )
+    parser.add_argument(
+        "-f", "--format",
+        type=str,
+        default="npz",
+        choices=["npz", "parquet"],
+        help="track file format (default: npz; parquet needs pyarrow)"
+    )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: CPU count)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the batch tracker."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+    if args.format == "parquet" and pq is None:
+        logger.error("Parquet output requires pyarrow (pip install pyarrow)")
+        sys.exit(1)
+    try:
+        config = load_config(args.config) if args.config else Config()
+    except (OSError, ConfigError) as e:
+        logger.error(f"Invalid configuration: {e}")
+        sys.exit(1)
+    if args.tracker is not None:
+        config.tracker.tracker_type = args.tracker
+
+    bboxes = load_bboxes(args.bboxes) if args.bboxes else {}
+    jobs = []
+    for video in find_videos(args.inputs):
+        bbox = bbox_for(video, bboxes, args.bbox)
+        if bbox is None:
+            logger.warning(f"Skipping {video}: no initial bounding box")
+            continue
+        jobs.append((video, bbox))
+    if not jobs:
+        logger.error("No videos to process")
+        sys.exit(1)
+
+    logger.info(f"Tracking {len(jobs)} videos with {config.tracker.tracker_type}")
+    try:
+        summary = run_batch(jobs, config, args.output, args.format, args.workers)
+    except ValueError as e:
+        logger.error(f"Cannot name track files: {e}")
+        sys.exit(1)
+
+    summary_path = os.path.join(args.output, "summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=4)
+    logger.info(f"{summary['total_frames']} frames in {summary['wall_seconds']:.2f} s "
+                f"({summary['throughput_fps']:.1f} FPS over {summary['workers']} workers)")
+    logger.info(f"Summary written to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Lens calibration and aiming lookup tables
+
+Calibrates the camera from checkerboard views in recorded videos or
+images, then turns the calibration into per-resolution tables:
+
+* an undistortion remap for cv2.remap, for when whole frames are needed
+* a pixel -> (pan, tilt) angle LUT, so aiming only looks up the bounding
+  box center instead of undistorting the frame
+
+Each table is built the first time it is asked for at a resolution and
+cached next to the calibration file; aiming only ever builds the LUT.
+
+Example:
+    python calibration.py recordings/checkerboard.mp4 --board 9x6 --square 25 -o camera.npz
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".bmp", ".jpg", ".jpeg", ".png", ".tif", ".tiff")
+
+
+class AimLUT:
+    """Pixel to pan/tilt angle lookup table for one resolution."""
+
+    def __init__(self, pan: np.ndarray, tilt: np.ndarray):
+        """Initialize the table.
+
+        Args:
+            pan: (H, W) pan angle in radians for each pixel, positive right
+            tilt: (H, W) tilt angle in radians for each pixel, positive up
+        """
+        self.pan = pan
+        self.tilt = tilt
+        self.height, self.width = pan.shape
+        cy, cx = self.height // 2, self.width // 2
+        # Angles of the frame edges through the center, used to normalize
+        self.half_fov_x = max(abs(pan[cy, 0]), abs(pan[cy, -1]))
+        self.half_fov_y = max(abs(tilt[0, cx]), abs(tilt[-1, cx]))
+
+    def angles(self, x: int, y: int) -> Tuple[float, float]:
+        """Return the (pan, tilt) angles in radians of a pixel."""
+        x = min(max(int(x), 0), self.width - 1)
+        y = min(max(int(y), 0), self.height - 1)
+        return float(self.pan[y, x]), float(self.tilt[y, x])
+
+    def normalized(self, x: int, y: int) -> Tuple[float, float]:
+        """Return the pixel's angles as a fraction (-1.0 to 1.0) of the half field of view."""
+        pan, tilt = self.angles(x, y)
+        return pan / self.half_fov_x, tilt / self.half_fov_y
+
+
+class CameraCalibration:
+    """Camera intrinsics with lazily built, cached per-resolution tables."""
+
+    def __init__(self, camera_matrix: np.ndarray, dist_coeffs: np.ndarray,
+                 image_size: Tuple[int, int], path: Optional[str] = None):
+        """Initialize the calibration.
+
+        Args:
+            camera_matrix: 3x3 intrinsic matrix at image_size
+            dist_coeffs: Distortion coefficients
+            image_size: (width, height) the calibration was made at
+            path: File the calibration was loaded from; tables are cached next to it
+        """
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.image_size = tuple(int(v) for v in image_size)
+        self.path = path
+        self._luts: Dict[Tuple[int, int], AimLUT] = {}
+        self._remaps: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "CameraCalibration":
+        """Load a calibration written by save()."""
+        with np.load(path) as data:
+            return cls(data["camera_matrix"], data["dist_coeffs"],
+                       tuple(data["image_size"]), path)
+
+    def save(self, path: str) -> None:
+        """Write the calibration to an .npz file."""
+        if not path.endswith(".npz"):
+            path += ".npz"
+        np.savez(path, camera_matrix=self.camera_matrix, dist_coeffs=self.dist_coeffs,
+                 image_size=np.array(self.image_size))
+        self.path = path
+
+    def scaled_matrix(self, width: int, height: int) -> np.ndarray:
+        """Return the intrinsic matrix for frames resized to width x height."""
+        sx = width / self.image_size[0]
+        sy = height / self.image_size[1]
+        matrix = self.camera_matrix.astype(np.float64).copy()
+        matrix[0, :] *= sx
+        matrix[1, :] *= sy
+        return matrix
+
+    def _cache_path(self, kind: str, width: int, height: int) -> Optional[str]:
+        if not self.path:
+            return None
+        return f"{os.path.splitext(self.path)[0]}_{width}x{height}{kind}.npz"
+
+    def _load_cached(self, kind: str, width: int, height: int) -> Optional[Dict[str, np.ndarray]]:
+        path = self._cache_path(kind, width, height)
+        if path is None or not os.path.exists(path):
+            return None
+        if self.path and os.path.getmtime(path) < os.path.getmtime(self.path):
+            return None  # calibration is newer than the cache
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def _save_cached(self, kind: str, width: int, height: int, **arrays: np.ndarray) -> None:
+        path = self._cache_path(kind, width, height)
+        if path is None:
+            return
+        try:
+            np.savez(path, **arrays)
+        except OSError as e:
+            logger.warning(f"Could not cache calibration tables: {e}")
+
+    def _build_lut(self, width: int, height: int) -> AimLUT:
+        """Build the pixel -> angle LUT for one resolution."""
+        matrix = self.scaled_matrix(width, height)
+        xs, ys = np.meshgrid(np.arange(width, dtype=np.float32),
+                             np.arange(height, dtype=np.float32))
+        points = np.stack([xs.ravel(), ys.ravel()], axis=1).reshape(-1, 1, 2)
+        normalized = cv2.undistortPoints(points, matrix, self.dist_coeffs).reshape(height, width, 2)
+        xn, yn = normalized[..., 0], normalized[..., 1]
+        # Pan rotates about the vertical axis first, then tilt about the
+        # panned horizontal axis; image y points down, tilt points up.
+        pan = np.arctan(xn).astype(np.float32)
+        tilt = np.arctan2(-yn, np.sqrt(1.0 + xn * xn)).astype(np.float32)
+        self._save_cached("", width, height, pan=pan, tilt=tilt)
+        logger.info(f"Built aiming table for {width}x{height}")
+        return AimLUT(pan, tilt)
+
+    def _build_remap(self, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Build the undistortion remap tables for one resolution."""
+        matrix = self.scaled_matrix(width, height)
+        map1, map2 = cv2.initUndistortRectifyMap(matrix, self.dist_coeffs, None, matrix,
+                                                 (width, height), cv2.CV_16SC2)
+        self._save_cached("_remap", width, height, map1=map1, map2=map2)
+        logger.info(f"Built undistortion maps for {width}x{height}")
+        return map1, map2
+
+    def lut(self, width: int, height: int) -> AimLUT:
+        """Return the pixel -> angle LUT for a resolution, building it on first use.
+
+        Building takes a while at large resolutions; call this ahead of the
+        control loop for the frame sizes in use.
+        """
+        key = (width, height)
+        if key not in self._luts:
+            cached = self._load_cached("", width, height)
+            if cached is not None:
+                self._luts[key] = AimLUT(cached["pan"], cached["tilt"])
+            else:
+                self._luts[key] = self._build_lut(width, height)
+        return self._luts[key]
+
+    def undistort(self, frame: np.ndarray) -> np.ndarray:
+        """Undistort a whole frame, building the remap tables on first use."""
+        height, width = frame.shape[:2]
+        key = (width, height)
+        if key not in self._remaps:
+            cached = self._load_cached("_remap", width, height)
+            if cached is not None:
+                self._remaps[key] = (cached["map1"], cached["map2"])
+            else:
+                self._remaps[key] = self._build_remap(width, height)
+        map1, map2 = self._remaps[key]
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR)
+
+
+def _iter_frames(inputs: List[str], every: int):
+    """Yield every Nth frame from videos and all images among the inputs."""
+    for item in inputs:
+        paths = sorted(glob.glob(os.path.join(item, "*"))) if os.path.isdir(item) else [item]
+        for path in paths:
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                image = cv2.imread(path)
+                if image is not None:
+                    yield image
+                continue
+            cap = cv2.VideoCapture(path)
+            index = 0
+            try:
+                while True:
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    if index % every == 0:
+                        yield frame
+                    index += 1
+            finally:
+                cap.release()
+
+
+def calibrate(inputs: List[str], board: Tuple[int, int], square_size: float,
+              every: int = 15, max_views: int = 60) -> Tuple[CameraCalibration, float]:
+    """Calibrate the camera from checkerboard views.
+
+    Args:
+        inputs: Videos, images or directories of them
+        board: Inner corners per (row, column) of the checkerboard
+        square_size: Checkerboard square size (any unit)
+        every: Use every Nth video frame
+        max_views: Stop after this many boards were found
+
+    Returns:
+        Tuple[CameraCalibration, float]: Calibration and RMS reprojection error in pixels
+    """
+    cols, rows = board
+    object_points = np.zeros((cols * rows, 3), np.float32)
+    object_points[:, :2] = np.mgrid[0:cols, 0:rows].T.reshape(-1, 2) * square_size
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+    obj_list, img_list, image_size = [], [], None
+    for frame in _iter_frames(inputs, every):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        size = gray.shape[::-1]
+        if image_size is None:
+            image_size = size
+        elif size != image_size:
+            logger.warning(f"Skipping {size[0]}x{size[1]} view; calibrating at "
+                           f"{image_size[0]}x{image_size[1]}")
+            continue
+        found, corners = cv2.findChessboardCorners(gray, board, None)
+        if not found:
+            continue
+        corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+        obj_list.append(object_points)
+        img_list.append(corners)
+        if len(obj_list) >= max_views:
+            break
+
+    if len(obj_list) < 5:
+        raise ValueError(f"found the checkerboard in only {len(obj_list)} views, need at least 5")
+    rms, matrix, dist, _, _ = cv2.calibrateCamera(obj_list, img_list, image_size, None, None)
+    logger.info(f"Calibrated from {len(obj_list)} views")
+    return CameraCalibration(matrix, dist, image_size), rms
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """Parse an ``AxB`` pair such as a board size or a resolution."""
+    try:
+        a, b = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected AxB, got {text!r}")
+    return a, b
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Calibrate the camera from checkerboard views")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="recorded videos, images or directories of them"
+    )
+    parser.add_argument(
+        "--board",
+        type=parse_size,
+        default=(9, 6),
+        help="inner corners as COLSxROWS (default: 9x6)"
+    )
+    parser.add_argument(
+        "--square",
+        type=float,
+        default=1.0,
+        help="checkerboard square size (default: 1.0)"
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        default=15,
+        help="use every Nth video frame (default: 15)"
+    )
+    parser.add_argument(
+        "--max-views",
+        type=int,
+        default=60,
+        help="maximum checkerboard views used (default: 60)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default="camera.npz",
+        help="output calibration file (default: camera.npz)"
+    )
+    parser.add_argument(
+        "--resolution",
+        type=parse_size,
+        action="append",
+        default=[],
+        help="prebuild aiming tables for WIDTHxHEIGHT (repeatable)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the calibration."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+    try:
+        calibration, rms = calibrate(args.inputs, args.board, args.square,
+                                     args.every, args.max_views)
+    except ValueError as e:
+        logger.error(f"Calibration failed: {e}")
+        sys.exit(1)
+    calibration.save(args.output)
+    logger.info(f"RMS reprojection error: {rms:.3f} px")
+    logger.info(f"Calibration written to {args.output}")
+    for width, height in args.resolution:
+        lut = calibration.lut(width, height)
+        logger.info(f"{width}x{height}: field of view "
+                    f"{np.degrees(2 * lut.half_fov_x):.1f} x {np.degrees(2 * lut.half_fov_y):.1f} deg")
+
+
+if __name__ == "__main__":
+    main()
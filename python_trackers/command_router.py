@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Datalink command router
+
+Reads joystick/datalink frames off the tracking loop. Joystick lines are
+forwarded to the gimbal as soon as they arrive, and lock/unlock commands
+are handed to the tracker with their arrival time so the command-to-effect
+latency can be measured.
+
+Datalink frames are ASCII lines of '-' separated fields, e.g.
+``X-0120-Y-0045-L-1-U-0``: field 0 is ``X``, field 5 is the lock flag and
+field 7 the unlock flag.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, List, Optional
+
+from latency import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+LOCK_FIELD = 5
+UNLOCK_FIELD = 7
+
+
+class CommandType(Enum):
+    """Commands the router hands to the tracker."""
+    LOCK = 0
+    UNLOCK = 1
+    EXIT = 2
+
+
+@dataclass
+class Command:
+    """A tracker command and the time its datalink frame was received."""
+    type: CommandType
+    received_at: float
+
+
+@dataclass
+class DatalinkFrame:
+    """A decoded datalink line."""
+    raw: bytes
+    fields: List[str]
+    lock: bool = False
+    unlock: bool = False
+
+
+def parse_datalink_frame(line: bytes) -> Optional[DatalinkFrame]:
+    """Decode one datalink line.
+
+    Args:
+        line: Raw line including the line terminator
+
+    Returns:
+        Optional[DatalinkFrame]: The decoded frame, or None if it is not ASCII
+    """
+    try:
+        text = line.decode('ascii').strip()
+    except UnicodeDecodeError:
+        return None
+    fields = text.split("-")
+    frame = DatalinkFrame(raw=line, fields=fields)
+    if fields[0] == 'X' and len(fields) > UNLOCK_FIELD:
+        frame.lock = fields[LOCK_FIELD] == '1'
+        frame.unlock = fields[UNLOCK_FIELD] == '1'
+    return frame
+
+
+class CommandRouter:
+    """Route datalink frames to the gimbal and the tracker state machine."""
+
+    def __init__(self, datalink,
+                 gimbal_write: Callable[[bytes], None],
+                 is_locked: Callable[[], bool],
+                 on_unlock: Optional[Callable[[], None]] = None,
+                 max_latency_ms: float = 50.0,
+                 unlock_exit_count: int = 0):
+        """Initialize the router.
+
+        Args:
+            datalink: Open serial port the datalink frames arrive on
+            gimbal_write: Writes raw bytes to the gimbal controller
+            is_locked: Returns True while a target is locked; joystick
+                frames are only forwarded while unlocked
+            on_unlock: Called from the router thread as soon as an unlock
+                arrives, so motor commands stop without waiting for a frame
+            max_latency_ms: Command-to-effect latency above which a warning is logged
+            unlock_exit_count: Consecutive unlock frames that request an exit (0 disables)
+        """
+        self.datalink = datalink
+        self.gimbal_write = gimbal_write
+        self.is_locked = is_locked
+        self.on_unlock = on_unlock
+        self.max_latency_ms = max_latency_ms
+        self.unlock_exit_count = unlock_exit_count
+        self.commands: "queue.Queue[Command]" = queue.Queue()
+        self.latency = LatencyStats(label="commands")
+        self.running = False
+        self._thread = None
+        self._lock_held = False
+        self._unlock_held = False
+        self._unlock_frames = 0
+
+    def start(self) -> None:
+        """Start reading datalink frames in a background thread."""
+        self.datalink.reset_input_buffer()
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the router thread."""
+        self.running = False
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=(self.datalink.timeout or 0) + 1.0)
+        logger.info(f"Datalink command latency: {self.latency}")
+
+    def _run(self) -> None:
+        while self.running and self.datalink.is_open:
+            try:
+                line = self.datalink.readline()
+            except Exception as e:
+                logger.error(f"Datalink read error: {e}")
+                break
+            if not line:
+                continue
+            try:
+                self.handle_line(line, time.perf_counter())
+            except Exception as e:
+                logger.error(f"Failed to route datalink frame {line!r}: {e}")
+
+    def handle_line(self, line: bytes, received_at: float) -> None:
+        """Route one datalink line.
+
+        Args:
+            line: Raw line as read from the datalink
+            received_at: time.perf_counter() when the line was read
+        """
+        frame = parse_datalink_frame(line)
+        if frame is None:
+            return
+
+        # Lock and unlock are edge-triggered; the flags repeat in every frame
+        if frame.lock and not self._lock_held:
+            self.commands.put(Command(CommandType.LOCK, received_at))
+        if frame.unlock:
+            if not self._unlock_held:
+                if self.on_unlock is not None:
+                    # The unlock takes effect here; the queued command only
+                    # resets the tracker state on the next frame
+                    self.on_unlock()
+                    self._record(CommandType.UNLOCK, received_at)
+                self.commands.put(Command(CommandType.UNLOCK, received_at))
+            self._unlock_frames += 1
+            if self._unlock_frames == self.unlock_exit_count:
+                self.commands.put(Command(CommandType.EXIT, received_at))
+        else:
+            self._unlock_frames = 0
+        self._lock_held = frame.lock
+        self._unlock_held = frame.unlock
+
+        if not self.is_locked():
+            self.gimbal_write(frame.raw)
+
+    def pending(self) -> List[Command]:
+        """Return and clear the commands waiting to be applied."""
+        commands = []
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def applied(self, command: Command) -> None:
+        """Record that a command took effect.
+
+        Only LOCK, and UNLOCK without an ``on_unlock`` callback, take effect
+        when applied on the frame; an unlock handled by ``on_unlock`` was
+        already timed when it arrived.
+
+        Args:
+            command: Command returned by pending()
+        """
+        if command.type is CommandType.LOCK or \
+                (command.type is CommandType.UNLOCK and self.on_unlock is None):
+            self._record(command.type, command.received_at)
+
+    def _record(self, command_type: CommandType, received_at: float) -> None:
+        """Add a command-to-effect latency sample, warning above the limit."""
+        latency_ms = (time.perf_counter() - received_at) * 1000.0
+        self.latency.add(latency_ms)
+        if latency_ms > self.max_latency_ms:
+            logger.warning(f"{command_type.name} took {latency_ms:.1f} ms "
+                           f"(limit {self.max_latency_ms:.0f} ms)")
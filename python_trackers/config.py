@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Runtime configuration
+
+Typed configuration for capture, tracker, control and serial settings,
+loaded from a JSON file and validated before use. A ConfigWatcher can
+apply changes live, either when the file is saved or when a JSON patch
+is sent to a local UDP control socket, e.g.:
+
+    echo '{"control": {"gain": 100}}' | nc -u -w1 127.0.0.1 5005
+"""
+
+import copy
+import json
+import logging
+import os
+import socket
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults
+DEFAULT_BAUDRATE = 115200
+SERIAL_DEVICE = '/dev/ttyUSB0'
+DEFAULT_FRAME_WIDTH = 640
+DEFAULT_FRAME_HEIGHT = 480
+DEFAULT_FLIP_METHOD = 2
+SERIAL_HEADER = 223
+SERIAL_XOR = 233
+DATALINK_BAUDRATE = 9600
+DEFAULT_GAIN = 127
+DEFAULT_ROI_SIZE = (75, 75)
+DEFAULT_CONTROL_PORT = 5005
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration file or patch is invalid."""
+
+
+@dataclass
+class CaptureConfig:
+    """Video capture settings."""
+    video_source: Optional[str] = None
+    frame_width: int = DEFAULT_FRAME_WIDTH
+    frame_height: int = DEFAULT_FRAME_HEIGHT
+    flip_method: int = DEFAULT_FLIP_METHOD
+
+
+@dataclass
+class TrackerConfig:
+    """Tracker settings."""
+    tracker_type: str = "kcf"
+    roi_size: Tuple[int, int] = DEFAULT_ROI_SIZE
+
+
+@dataclass
+class PreprocessConfig:
+    """Frame preprocessing settings.
+
+    The tracker runs at ``tracker_scale`` times the capture frame size.
+    Grayscale suits MOSSE and KCF; CSRT expects BGR. With ``adaptive`` the
+    scale varies per frame between ``adaptive_min_scale`` and
+    ``tracker_scale`` depending on target size and frame-time headroom.
+    """
+    tracker_scale: float = 1.0
+    tracker_grayscale: bool = False
+    clahe: bool = False
+    clahe_clip_limit: float = 2.0
+    clahe_tile_size: int = 8
+    adaptive: bool = False
+    adaptive_min_scale: float = 0.25
+    adaptive_target_fps: float = 30.0
+    adaptive_min_target_px: int = 24
+    adaptive_max_target_px: int = 96
+
+
+@dataclass
+class DetectorConfig:
+    """Optional neural detector, enabled by setting ``model`` to an ONNX file.
+
+    Frames are submitted every ``interval`` frames; with ``auto_lock`` the
+    tracker locks onto the best detection whenever no target is tracked,
+    except after an explicit unlock or disable until the next manual lock.
+    """
+    model: Optional[str] = None
+    backend: str = "auto"
+    input_width: int = 320
+    input_height: int = 320
+    fp16: bool = False
+    threads: int = 0
+    max_batch: int = 8
+    conf_threshold: float = 0.4
+    nms_threshold: float = 0.45
+    interval: int = 1
+    auto_lock: bool = False
+
+
+@dataclass
+class ControlConfig:
+    """Gimbal control settings.
+
+    The command sent per axis is ``gain * pid(error)`` where ``error`` is
+    the normalized (-1.0 to 1.0) offset of the target from the frame center.
+    With a ``calibration`` file from calibration.py the offset is measured
+    as an angle, correcting lens distortion toward the frame edges.
+    """
+    gain: int = DEFAULT_GAIN
+    kp: float = 1.0
+    ki: float = 0.0
+    kd: float = 0.0
+    calibration: Optional[str] = None
+
+
+@dataclass
+class SerialConfig:
+    """Serial links to the Arduino and the joystick datalink.
+
+    The datalink is only opened when ``datalink_device`` is set.
+    """
+    device: str = SERIAL_DEVICE
+    baudrate: int = DEFAULT_BAUDRATE
+    timeout: float = 1.0
+    header: int = SERIAL_HEADER
+    xor: int = SERIAL_XOR
+    datalink_device: Optional[str] = None
+    datalink_baudrate: int = DATALINK_BAUDRATE
+    datalink_max_latency_ms: float = 50.0
+    datalink_unlock_exit_count: int = 20
+
+
+@dataclass
+class Config:
+    """Top-level configuration."""
+    capture: CaptureConfig = field(default_factory=CaptureConfig)
+    tracker: TrackerConfig = field(default_factory=TrackerConfig)
+    preprocess: PreprocessConfig = field(default_factory=PreprocessConfig)
+    detector: DetectorConfig = field(default_factory=DetectorConfig)
+    control: ControlConfig = field(default_factory=ControlConfig)
+    serial: SerialConfig = field(default_factory=SerialConfig)
+
+    def validate(self) -> None:
+        """Check value ranges.
+
+        Raises:
+            ConfigError: If any value is out of range
+        """
+        errors: List[str] = []
+        if self.capture.frame_width <= 0 or self.capture.frame_height <= 0:
+            errors.append("capture.frame_width/frame_height must be positive")
+        if not 0 <= self.capture.flip_method <= 7:
+            errors.append("capture.flip_method must be between 0 and 7")
+        if not self.tracker.tracker_type:
+            errors.append("tracker.tracker_type must not be empty")
+        if len(self.tracker.roi_size) != 2 or min(self.tracker.roi_size) <= 0:
+            errors.append("tracker.roi_size must be two positive integers")
+        if not 0 < self.preprocess.tracker_scale <= 1.0:
+            errors.append("preprocess.tracker_scale must be in (0, 1]")
+        if self.preprocess.clahe_clip_limit <= 0 or self.preprocess.clahe_tile_size <= 0:
+            errors.append("preprocess.clahe_clip_limit/clahe_tile_size must be positive")
+        if self.preprocess.adaptive:
+            # Only checked when used, so a fixed tracker_scale may go below the default minimum
+            if not 0 < self.preprocess.adaptive_min_scale <= self.preprocess.tracker_scale:
+                errors.append("preprocess.adaptive_min_scale must be in (0, tracker_scale]")
+            if self.preprocess.adaptive_target_fps <= 0:
+                errors.append("preprocess.adaptive_target_fps must be positive")
+            if not 0 < self.preprocess.adaptive_min_target_px < self.preprocess.adaptive_max_target_px:
+                errors.append("preprocess.adaptive_min_target_px must be positive and "
+                              "below adaptive_max_target_px")
+        if self.detector.backend not in ("auto", "dnn", "onnxruntime"):
+            errors.append("detector.backend must be auto, dnn or onnxruntime")
+        if self.detector.input_width <= 0 or self.detector.input_height <= 0:
+            errors.append("detector.input_width/input_height must be positive")
+        if not 1 <= self.detector.max_batch <= 64:
+            errors.append("detector.max_batch must be in 1..64")
+        if self.detector.interval < 1 or self.detector.threads < 0:
+            errors.append("detector.interval must be positive and detector.threads not negative")
+        for name in ("conf_threshold", "nms_threshold"):
+            if not 0.0 <= getattr(self.detector, name) <= 1.0:
+                errors.append(f"detector.{name} must be between 0 and 1")
+        if not 0 < self.control.gain <= 32767:
+            errors.append("control.gain must be in 1..32767")
+        if self.serial.baudrate <= 0:
+            errors.append("serial.baudrate must be positive")
+        if self.serial.timeout < 0:
+            errors.append("serial.timeout must not be negative")
+        if self.serial.datalink_baudrate <= 0:
+            errors.append("serial.datalink_baudrate must be positive")
+        if self.serial.datalink_max_latency_ms <= 0:
+            errors.append("serial.datalink_max_latency_ms must be positive")
+        if self.serial.datalink_unlock_exit_count < 0:
+            errors.append("serial.datalink_unlock_exit_count must not be negative")
+        for name in ("header", "xor"):
+            if not 0 <= getattr(self.serial, name) <= 255:
+                errors.append(f"serial.{name} must fit in one byte")
+        if errors:
+            raise ConfigError("; ".join(errors))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the configuration as a plain dict."""
+        return asdict(self)
+
+
+SECTIONS = {
+    "capture": CaptureConfig,
+    "tracker": TrackerConfig,
+    "preprocess": PreprocessConfig,
+    "detector": DetectorConfig,
+    "control": ControlConfig,
+    "serial": SerialConfig,
+}
+
+
+def _is_int(value: Any) -> bool:
+    # bool is a subclass of int, but true/false are not valid integers here
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_value(default: Any, value: Any) -> Tuple[Any, Optional[str]]:
+    """Check a JSON value against the type of a field's default.
+
+    Returns:
+        Tuple[Any, Optional[str]]: The value in the field's type, and the
+        expected type name if the value does not match (None if it does)
+    """
+    if isinstance(default, tuple):
+        if isinstance(value, (list, tuple)) and all(_is_int(v) for v in value):
+            return tuple(value), None
+        return value, "a list of integers"
+    if isinstance(default, bool):
+        return value, None if isinstance(value, bool) else "true or false"
+    if isinstance(default, int):
+        return value, None if _is_int(value) else "an integer"
+    if isinstance(default, float):
+        # Integers are accepted for float fields, e.g. "kp": 1
+        if _is_int(value) or isinstance(value, float):
+            return float(value), None
+        return value, "a number"
+    if isinstance(value, str) or (default is None and value is None):
+        return value, None
+    return value, "a string" if default is not None else "a string or null"
+
+
+def _build_section(name: str, cls: type, values: Dict[str, Any]) -> Any:
+    """Build one section dataclass, rejecting values of the wrong type."""
+    if not isinstance(values, dict):
+        raise ConfigError(f"section '{name}' must be an object")
+    known = {f.name: f for f in fields(cls)}
+    unknown = set(values) - set(known)
+    if unknown:
+        raise ConfigError(f"unknown keys in '{name}': {', '.join(sorted(unknown))}")
+
+    section = cls()
+    for key, value in values.items():
+        value, expected = _check_value(getattr(section, key), value)
+        if expected is not None:
+            raise ConfigError(f"invalid value for {name}.{key}: {value!r} (expected {expected})")
+        setattr(section, key, value)
+    return section
+
+
+def config_from_dict(data: Dict[str, Any]) -> Config:
+    """Build and validate a Config from a (possibly partial) dict.
+
+    Args:
+        data: Mapping of section name to section values
+
+    Returns:
+        Config: Validated configuration
+
+    Raises:
+        ConfigError: If the data contains unknown keys or invalid values
+    """
+    if not isinstance(data, dict):
+        raise ConfigError("configuration must be an object")
+    unknown = set(data) - set(SECTIONS)
+    if unknown:
+        raise ConfigError(f"unknown sections: {', '.join(sorted(unknown))}")
+
+    config = Config(**{
+        name: _build_section(name, cls, data.get(name, {}))
+        for name, cls in SECTIONS.items()
+    })
+    config.validate()
+    return config
+
+
+def load_config(path: str) -> Config:
+    """Load and validate a configuration file.
+
+    Args:
+        path: Path to a JSON configuration file
+
+    Returns:
+        Config: Validated configuration
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path}: {e}") from e
+    return config_from_dict(data)
+
+
+def merge_patch(config: Config, patch: Dict[str, Any]) -> Config:
+    """Apply a partial update to a configuration.
+
+    Args:
+        config: Current configuration
+        patch: Mapping of section name to the values to change
+
+    Returns:
+        Config: New validated configuration; ``config`` is left untouched
+    """
+    data = config.to_dict()
+    if not isinstance(patch, dict):
+        raise ConfigError("patch must be an object")
+    for name, values in patch.items():
+        if name not in data or not isinstance(values, dict):
+            raise ConfigError(f"invalid patch section: {name!r}")
+        data[name].update(values)
+    return config_from_dict(data)
+
+
+def changed_sections(old: Config, new: Config) -> Set[str]:
+    """Return the names of the sections that differ between two configs."""
+    return {name for name in SECTIONS if getattr(old, name) != getattr(new, name)}
+
+
+class ConfigWatcher:
+    """Watch a config file and a local control socket for changes.
+
+    ``on_change`` is called from the watcher thread with each new,
+    validated Config. Invalid updates are logged and ignored.
+    ``overrides`` (e.g. command line options) are re-applied on top of
+    the file every time it is reloaded.
+    """
+
+    def __init__(self, config: Config,
+                 on_change: Callable[[Config], None],
+                 path: Optional[str] = None,
+                 control_port: Optional[int] = None,
+                 poll_interval: float = 0.5,
+                 overrides: Optional[Dict[str, Any]] = None):
+        """Initialize the watcher.
+
+        Args:
+            config: Configuration currently in use
+            on_change: Callback receiving each new configuration
+            path: Config file to watch (optional)
+            control_port: UDP port on localhost to accept JSON patches (optional)
+            poll_interval: Seconds between file modification checks
+            overrides: Patch applied to every reload of the file (optional)
+        """
+        self.config = config
+        self.on_change = on_change
+        self.path = path
+        self.overrides = overrides or {}
+        self.control_port = control_port
+        self.poll_interval = poll_interval
+        self.running = False
+        self._lock = threading.Lock()
+        self._mtime = self._file_mtime()
+        self._sock = None
+        self._thread = None
+
+    def _file_mtime(self) -> Optional[float]:
+        if not self.path:
+            return None
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        if self.control_port is not None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.bind(("127.0.0.1", self.control_port))
+            self._sock.settimeout(self.poll_interval)
+            logger.info(f"Config control socket listening on 127.0.0.1:{self.control_port}")
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread and close the control socket."""
+        self.running = False
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2 * self.poll_interval + 1.0)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _publish(self, new: Config, origin: str) -> None:
+        with self._lock:
+            changed = changed_sections(self.config, new)
+            if not changed:
+                return
+            self.config = new
+        logger.info(f"Config updated from {origin}: {', '.join(sorted(changed))}")
+        self.on_change(new)
+
+    def applied(self, requested: Config, effective: Config) -> None:
+        """Record the configuration actually in effect after applying one.
+
+        The consumer may revert settings it cannot change live (e.g. fields
+        that need a restart). Later patches are merged onto ``effective``,
+        unless a newer config was published since ``requested``; that one
+        is still to be applied and stays the base.
+
+        Args:
+            requested: Config passed to ``on_change``
+            effective: What the consumer applied from it
+        """
+        with self._lock:
+            if self.config is requested:
+                self.config = effective
+
+    def _check_file(self) -> None:
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            self._publish(merge_patch(load_config(self.path), self.overrides), self.path)
+        except (OSError, ConfigError) as e:
+            logger.error(f"Ignoring invalid config file: {e}")
+
+    def _handle_patch(self, payload: bytes) -> str:
+        try:
+            patch = json.loads(payload.decode("utf-8"))
+            with self._lock:
+                new = merge_patch(copy.deepcopy(self.config), patch)
+        except (UnicodeDecodeError, json.JSONDecodeError, ConfigError) as e:
+            logger.error(f"Ignoring invalid config patch: {e}")
+            return f"error: {e}"
+        self._publish(new, "control socket")
+        return "ok"
+
+    def _run(self) -> None:
+        while self.running:
+            self._check_file()
+            if self._sock is None:
+                threading.Event().wait(self.poll_interval)
+                continue
+            try:
+                payload, addr = self._sock.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            reply = self._handle_patch(payload)
+            try:
+                self._sock.sendto(reply.encode("utf-8"), addr)
+            except OSError:
+                pass
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="NeoVisionAim configuration tool")
+    parser.add_argument(
+        "config",
+        type=str,
+        nargs="?",
+        default=None,
+        help="config file to validate (omit to print the defaults)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Validate a config file, or print the default configuration."""
+    args = parse_arguments()
+    try:
+        config = load_config(args.config) if args.config else Config()
+    except (OSError, ConfigError) as e:
+        print(f"Invalid configuration: {e}")
+        raise SystemExit(1)
+    print(json.dumps(config.to_dict(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
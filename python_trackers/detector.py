@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - CPU neural detector engine
+
+Runs a small ONNX detection model (YOLOv5/v8 style output) on the CPU
+with cv2.dnn or, when installed, ONNX Runtime. One background worker
+batches the latest frame from every submitting source (e.g. several
+ObjectTracker instances, one per camera) into a single inference call,
+and results are kept in a cache keyed by (source, frame id) that the
+tracking loops poll without waiting.
+
+Benchmark throughput and latency for batch sizes 1-8:
+    python detector.py yolov5n.onnx --benchmark --batch-sizes 1 2 4 8
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from latency import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Detection:
+    """One detected object in source frame pixels."""
+    x: int
+    y: int
+    w: int
+    h: int
+    score: float
+    class_id: int
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return (self.x, self.y, self.w, self.h)
+
+
+class DnnBackend:
+    """Inference through cv2.dnn on the CPU."""
+
+    name = "dnn"
+
+    def __init__(self, model_path: str, fp16: bool = False, threads: int = 0):
+        self.net = cv2.dnn.readNet(model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        target = cv2.dnn.DNN_TARGET_CPU
+        if fp16:
+            if hasattr(cv2.dnn, "DNN_TARGET_CPU_FP16"):
+                target = cv2.dnn.DNN_TARGET_CPU_FP16
+            else:
+                logger.warning("This OpenCV build has no FP16 CPU target, using FP32")
+        self.net.setPreferableTarget(target)
+        if threads:
+            cv2.setNumThreads(threads)
+        self.dynamic_batch = True
+
+    def infer(self, blob: np.ndarray) -> np.ndarray:
+        if self.dynamic_batch or len(blob) == 1:
+            try:
+                self.net.setInput(blob)
+                return self.net.forward()
+            except cv2.error:
+                if len(blob) == 1:
+                    raise
+                # Models exported with a fixed batch of 1 run frame by frame
+                logger.warning("Model does not accept batches, running frames one at a time")
+                self.dynamic_batch = False
+        outputs = []
+        for i in range(len(blob)):
+            self.net.setInput(blob[i:i + 1])
+            outputs.append(self.net.forward())
+        return np.concatenate(outputs)
+
+
+def _import_onnxruntime():
+    """Import ONNX Runtime on first use; it is optional and slow to import."""
+    try:
+        import onnxruntime
+    except ImportError:  # cv2.dnn is the fallback
+        return None
+    return onnxruntime
+
+
+class OrtBackend:
+    """Inference through ONNX Runtime on the CPU."""
+
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str, threads: int = 0):
+        ort = _import_onnxruntime()
+        if ort is None:
+            raise ImportError("onnxruntime is not installed (pip install onnxruntime)")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options,
+                                            providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_type = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        # A fixed batch dimension of 1 means frames must be run one at a time
+        self.dynamic_batch = not isinstance(model_input.shape[0], int) or model_input.shape[0] != 1
+
+    def infer(self, blob: np.ndarray) -> np.ndarray:
+        blob = blob.astype(self.input_type, copy=False)
+        if self.dynamic_batch or len(blob) == 1:
+            return self.session.run(None, {self.input_name: blob})[0]
+        return np.concatenate([self.session.run(None, {self.input_name: blob[i:i + 1]})[0]
+                               for i in range(len(blob))])
+
+
+def create_backend(model_path: str, backend: str = "auto", fp16: bool = False, threads: int = 0):
+    """Create an inference backend.
+
+    Args:
+        model_path: ONNX model (FP32, FP16 or int8-quantized)
+        backend: "dnn", "onnxruntime" or "auto" (ONNX Runtime when installed)
+        fp16: Request the FP16 CPU target (cv2.dnn only; ONNX Runtime follows the model)
+        threads: Inference threads (0 for the library default)
+    """
+    if backend == "onnxruntime" or (backend == "auto" and _import_onnxruntime() is not None):
+        return OrtBackend(model_path, threads)
+    return DnnBackend(model_path, fp16, threads)
+
+
+def decode_yolo(output: np.ndarray, scale: Tuple[float, float],
+                conf_threshold: float, nms_threshold: float,
+                frame_size: Optional[Tuple[int, int]] = None) -> List[Detection]:
+    """Decode one image's YOLO output into detections.
+
+    Args:
+        output: (N, 5 + C) YOLOv5 rows (cx, cy, w, h, objectness, classes...)
+            or (4 + C, N) YOLOv8 columns (cx, cy, w, h, classes...)
+        scale: (x, y) factors from model input to source frame pixels
+        conf_threshold: Minimum score
+        nms_threshold: IoU threshold for non-maximum suppression
+        frame_size: (width, height) of the source frame; boxes are clipped to it
+
+    Returns:
+        List[Detection]: Detections sorted by score, highest first
+    """
+    if output.shape[0] < output.shape[1]:
+        # YOLOv8 layout: no objectness column
+        output = output.T
+        class_scores = output[:, 4:]
+    else:
+        class_scores = output[:, 5:] * output[:, 4:5]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+    keep = scores >= conf_threshold
+    if not keep.any():
+        return []
+    boxes = output[keep, :4].astype(np.float32)
+    scores = scores[keep]
+    class_ids = class_ids[keep]
+
+    sx, sy = scale
+    boxes[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2) * sx
+    boxes[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2) * sy
+    boxes[:, 2] *= sx
+    boxes[:, 3] *= sy
+    if frame_size is not None:
+        # Boxes reaching past the frame edge would be passed to tracker.init as is
+        x2 = np.clip(boxes[:, 0] + boxes[:, 2], 0, frame_size[0])
+        y2 = np.clip(boxes[:, 1] + boxes[:, 3], 0, frame_size[1])
+        boxes[:, 0] = np.clip(boxes[:, 0], 0, frame_size[0])
+        boxes[:, 1] = np.clip(boxes[:, 1], 0, frame_size[1])
+        boxes[:, 2] = x2 - boxes[:, 0]
+        boxes[:, 3] = y2 - boxes[:, 1]
+        inside = (boxes[:, 2] >= 1) & (boxes[:, 3] >= 1)
+        if not inside.all():
+            boxes, scores, class_ids = boxes[inside], scores[inside], class_ids[inside]
+    indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(), conf_threshold, nms_threshold)
+    detections = [
+        Detection(int(boxes[i, 0]), int(boxes[i, 1]), int(boxes[i, 2]), int(boxes[i, 3]),
+                  float(scores[i]), int(class_ids[i]))
+        for i in np.asarray(indices).reshape(-1)
+    ]
+    return sorted(detections, key=lambda d: d.score, reverse=True)
+
+
+class DetectionCache:
+    """Recent detections keyed by (source id, frame id)."""
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Tuple[str, int], List[Detection]]" = OrderedDict()
+        self._latest: Dict[str, Tuple[int, List[Detection]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, source_id: str, frame_id: int, detections: List[Detection]) -> None:
+        with self._lock:
+            self._entries[(source_id, frame_id)] = detections
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            latest = self._latest.get(source_id)
+            if latest is None or frame_id >= latest[0]:
+                self._latest[source_id] = (frame_id, detections)
+
+    def get(self, source_id: str, frame_id: int) -> Optional[List[Detection]]:
+        with self._lock:
+            return self._entries.get((source_id, frame_id))
+
+    def latest(self, source_id: str) -> Optional[Tuple[int, List[Detection]]]:
+        with self._lock:
+            return self._latest.get(source_id)
+
+
+class DetectionEngine:
+    """Asynchronous, batching detector shared by several frame sources."""
+
+    def __init__(self, model_path: str,
+                 backend: str = "auto",
+                 input_size: Tuple[int, int] = (320, 320),
+                 fp16: bool = False,
+                 threads: int = 0,
+                 max_batch: int = 8,
+                 max_wait_ms: float = 2.0,
+                 conf_threshold: float = 0.4,
+                 nms_threshold: float = 0.45,
+                 cache_size: int = 256):
+        """Load the model and start the inference worker.
+
+        Args:
+            model_path: ONNX model
+            backend: "dnn", "onnxruntime" or "auto"
+            input_size: Model input (width, height)
+            fp16: Request the FP16 CPU target (cv2.dnn only)
+            threads: Inference threads (0 for the library default)
+            max_batch: Maximum frames per inference call
+            max_wait_ms: How long the worker waits for more sources to fill a batch
+            conf_threshold: Minimum detection score
+            nms_threshold: IoU threshold for non-maximum suppression
+            cache_size: Number of (source, frame) results kept
+        """
+        self.backend = create_backend(model_path, backend, fp16, threads)
+        self.input_size = input_size
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.conf_threshold = conf_threshold
+        self.nms_threshold = nms_threshold
+        self.cache = DetectionCache(cache_size)
+        self.latency = LatencyStats(label="frames")
+        self.batches = 0
+        self.frames = 0
+        self.dropped = 0
+        # Only the newest unprocessed frame per source is kept
+        self._pending: "OrderedDict[str, Tuple[int, np.ndarray, Tuple[float, float], float]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Detector running on {self.backend.name} "
+                    f"({input_size[0]}x{input_size[1]}, batch up to {max_batch})")
+
+    def submit(self, source_id: str, frame_id: int, frame: np.ndarray) -> None:
+        """Queue a frame for detection; never waits for inference.
+
+        The frame is resized to the model input here, so the caller may
+        reuse its buffer right away. An older frame from the same source
+        that is still waiting is replaced.
+
+        Args:
+            source_id: Camera or tracker the frame comes from
+            frame_id: Increasing frame number within the source
+            frame: BGR frame
+        """
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, self.input_size, interpolation=cv2.INTER_AREA)
+        scale = (width / self.input_size[0], height / self.input_size[1])
+        with self._cond:
+            if source_id in self._pending:
+                self.dropped += 1
+            self._pending[source_id] = (frame_id, small, scale, time.perf_counter())
+            self._cond.notify()
+
+    def latest(self, source_id: str) -> Optional[Tuple[int, List[Detection]]]:
+        """Return (frame id, detections) of the newest result for a source."""
+        return self.cache.latest(source_id)
+
+    def result(self, source_id: str, frame_id: int) -> Optional[List[Detection]]:
+        """Return the detections for one frame if they are ready."""
+        return self.cache.get(source_id, frame_id)
+
+    def _take_batch(self):
+        with self._cond:
+            while self.running and not self._pending:
+                self._cond.wait(0.1)
+            if not self.running:
+                return []
+            deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    break
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False))
+            return batch
+
+    def _run(self) -> None:
+        while self.running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                blob = cv2.dnn.blobFromImages([item[1] for _, item in batch], 1 / 255.0,
+                                              self.input_size, swapRB=True)
+                outputs = self.backend.infer(blob)
+            except Exception as e:
+                logger.error(f"Detector inference failed: {e}")
+                continue
+            done = time.perf_counter()
+            for (source_id, (frame_id, _, scale, submitted)), output in zip(batch, outputs):
+                frame_size = (round(scale[0] * self.input_size[0]),
+                              round(scale[1] * self.input_size[1]))
+                detections = decode_yolo(output, scale, self.conf_threshold,
+                                         self.nms_threshold, frame_size)
+                self.cache.put(source_id, frame_id, detections)
+                self.latency.add((done - submitted) * 1000.0)
+            self.batches += 1
+            self.frames += len(batch)
+
+    def stop(self) -> None:
+        """Stop the inference worker."""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=5.0)
+        if self.batches:
+            logger.info(f"Detector: {self.frames} frames in {self.batches} batches "
+                        f"({self.frames / self.batches:.1f} per batch), {self.dropped} superseded, "
+                        f"latency {self.latency}")
+
+
+def benchmark(backend, input_size: Tuple[int, int], batch_sizes: Sequence[int],
+              iterations: int = 50, warmup: int = 5) -> List[Dict[str, float]]:
+    """Measure inference throughput and latency per batch size.
+
+    Args:
+        backend: Backend from create_backend()
+        input_size: Model input (width, height)
+        batch_sizes: Batch sizes to measure
+        iterations: Timed inference calls per batch size
+        warmup: Untimed calls before measuring
+
+    Returns:
+        List[Dict[str, float]]: One row per batch size
+    """
+    rng = np.random.default_rng(0)
+    rows = []
+    for batch_size in batch_sizes:
+        images = [rng.integers(0, 256, (input_size[1], input_size[0], 3), dtype=np.uint8)
+                  for _ in range(batch_size)]
+        blob = cv2.dnn.blobFromImages(images, 1 / 255.0, input_size, swapRB=True)
+        for _ in range(warmup):
+            backend.infer(blob)
+        times = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            backend.infer(blob)
+            times.append((time.perf_counter() - start) * 1000.0)
+        times = np.array(times)
+        rows.append({
+            "batch": batch_size,
+            "latency_ms_p50": float(np.percentile(times, 50)),
+            "latency_ms_p95": float(np.percentile(times, 95)),
+            "throughput_fps": batch_size * 1000.0 / float(times.mean()),
+        })
+    return rows
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(description="CPU detector engine")
+    parser.add_argument("model", type=str, help="ONNX detection model")
+    parser.add_argument("--backend", type=str, default="auto",
+                        choices=["auto", "dnn", "onnxruntime"],
+                        help="inference backend (default: auto)")
+    parser.add_argument("--input-size", type=int, nargs=2, default=[320, 320],
+                        metavar=("WIDTH", "HEIGHT"), help="model input size (default: 320 320)")
+    parser.add_argument("--fp16", action="store_true", help="use the FP16 CPU target (cv2.dnn)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="inference threads (default: library default)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure throughput and latency per batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(range(1, 9)),
+                        help="batch sizes to benchmark (default: 1-8)")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="timed inference calls per batch size (default: 50)")
+    parser.add_argument("-v", "--video", type=str, default=None,
+                        help="print detections for a video instead of benchmarking")
+    return parser.parse_args()
+
+
+def main():
+    """Benchmark the detector or run it over a video."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+    input_size = tuple(args.input_size)
+
+    if args.benchmark or not args.video:
+        backend = create_backend(args.model, args.backend, args.fp16, args.threads)
+        print(f"Backend: {backend.name}, input {input_size[0]}x{input_size[1]}")
+        print(f"{'batch':>5} {'p50 ms':>8} {'p95 ms':>8} {'frames/s':>9}")
+        for row in benchmark(backend, input_size, args.batch_sizes, args.iterations):
+            print(f"{row['batch']:5d} {row['latency_ms_p50']:8.2f} "
+                  f"{row['latency_ms_p95']:8.2f} {row['throughput_fps']:9.1f}")
+        return
+
+    engine = DetectionEngine(args.model, args.backend, input_size, args.fp16, args.threads)
+    cap = cv2.VideoCapture(args.video)
+    frame_id = 0
+    printed = -1
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            engine.submit("video", frame_id, frame)
+            latest = engine.latest("video")
+            if latest is not None and latest[0] > printed:
+                printed = latest[0]
+                print(f"frame {printed}: {[d.bbox for d in latest[1]]}")
+            frame_id += 1
+    finally:
+        cap.release()
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Latency statistics
+
+Rolling latency percentiles shared by the datalink command router and
+the detector engine.
+"""
+
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling latency statistics in milliseconds."""
+
+    def __init__(self, window: int = 1000, label: str = "samples"):
+        """Initialize the statistics.
+
+        Args:
+            window: Number of recent samples kept for percentiles
+            label: What one sample counts, used in the summary (e.g. "commands")
+        """
+        self.samples = deque(maxlen=window)
+        self.label = label
+        self.count = 0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        """Record one latency sample."""
+        self.samples.append(latency_ms)
+        self.count += 1
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Return the given percentile of the recent samples."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+    def __str__(self) -> str:
+        return (f"{self.count} {self.label}, p50 {self.percentile(50):.1f} ms, "
+                f"p95 {self.percentile(95):.1f} ms, max {self.max_ms:.1f} ms")
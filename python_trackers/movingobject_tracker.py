@@ -5,6 +5,7 @@ import imutils
 import time
 import cv2
 import serial
+from tracker_registry import TRACKERS
 length = None
 sox = 0
 soy = 0 
@@ -19,16 +20,8 @@ ap = argparse.ArgumentParser()
 ap.add_argument("-v", "--video", type=str, help="path to video file")
 ap.add_argument("-t", "--tracker", type=str, default="kcf", help="Object Tracker type")
 args = vars(ap.parse_args())
-OPENCV_OBJECT_TRACKER = {
-    "csrt": cv2.TrackerCSRT_create,
-    "kcf": cv2.TrackerKCF_create,
-    "boosting": cv2.TrackerBoosting_create,
-    "mil": cv2.TrackerMIL_create,
-    "tld": cv2.TrackerTLD_create,
-    "medianflow": cv2.TrackerMedianFlow_create,
-    "mosse": cv2.TrackerMOSSE_create,
-    "goturn": cv2.TrackerGOTURN_create
-}
+#Trackers are looked up lazily; legacy ones live under cv2.legacy on OpenCV >= 4.5
+OPENCV_OBJECT_TRACKER = TRACKERS
 #Initialize Ardiuno
 ardiuno = serial.Serial('/dev/ttyTHS0', 9600, timeout = 1)
 print("Connecting to ardiuno...")
@@ -63,9 +56,8 @@ fps = None
     #Loop over frames from the video stream
 frame = vs.read()
 #today
-frame = imutils.resize(frame, width=890)
-frame = imutils.resize(frame, height=500)
 frame = frame[1] if args.get("video", False) else frame
+frame = imutils.resize(frame, height=500)
 (H, W) = frame.shape[:2]
 print("WIdth: {0} Hight: {1}".format(W,H))
 #cv2.rectangle(frame, (217, 154), (67, 68), (255,0,0), 2)   #(217, 154, 67, 68)
@@ -99,13 +91,12 @@ while True:
     #length = int(vs.get(cv2.CAP_PROP_FRAME_COUNT))
     frame = vs.read()
     frame = frame[1] if args.get("video", False) else frame
-    #today
-    frame = imutils.resize(frame, width=890)
-    frame = imutils.resize(frame, height=500)
 
     #check to see if we reached to end of stream
     if frame is None:
         break
+    #a single resample; resizing to width=890 first was overridden by height=500
+    frame = imutils.resize(frame, height=500)
     #resize frame so we can process it faster adn grabe the frame dimensions
     #frame = imutils.resize(frame, width=500)
     
@@ -8,6 +8,7 @@ import threading
 import serial
 import os
 from struct import *
+from tracker_registry import TRACKERS
 
 
 # data to send to Arduino
@@ -58,16 +59,8 @@ ap.add_argument("-v", "--video", type=str, help="path to video file")
 ap.add_argument("-t", "--tracker", type=str, default="kcf", help="Object Tracker type")
 args = vars(ap.parse_args())
 
-OPENCV_OBJECT_TRACKER = {
-    "csrt": cv2.TrackerCSRT_create,
-    "kcf": cv2.TrackerKCF_create,
-    "boosting": cv2.TrackerBoosting_create,
-    "mil": cv2.TrackerMIL_create,
-    "tld": cv2.TrackerTLD_create,
-    "medianflow": cv2.TrackerMedianFlow_create,
-    "mosse": cv2.TrackerMOSSE_create
-    
-}
+#Trackers are looked up lazily; legacy ones live under cv2.legacy on OpenCV >= 4.5
+OPENCV_OBJECT_TRACKER = TRACKERS
 
 
 #Grab the approperiate tracker
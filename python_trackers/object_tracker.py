@@ -7,9 +7,12 @@ for controlling a stepper motor gimbal.
 """
 
 import argparse
+import copy
 import logging
 import os
+import queue
 import sys
+import threading
 import time
 from dataclasses import dataclass
 from enum import Enum
@@ -17,9 +20,23 @@ from struct import pack
 from typing import Dict, Optional, Tuple, Union, Any
 
 import cv2
+import numpy as np
 import serial
 from imutils.video import FPS, VideoStream
 
+from adaptive_resolution import ResolutionController, scale_ladder
+from calibration import AimLUT, CameraCalibration
+from command_router import CommandRouter, CommandType
+from detector import DetectionEngine
+from preprocess import Preprocessor, build_preprocessor
+from telemetry import TelemetryWriter
+from tracker_registry import TRACKERS, TrackerUnavailableError
+from config import (
+    DEFAULT_CONTROL_PORT, DEFAULT_FLIP_METHOD, DEFAULT_FRAME_HEIGHT,
+    DEFAULT_FRAME_WIDTH, Config, ConfigError, ConfigWatcher, changed_sections,
+    load_config, merge_patch
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,14 +45,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Constants
-DEFAULT_BAUDRATE = 115200
-SERIAL_DEVICE = '/dev/ttyUSB0'
-DEFAULT_FRAME_WIDTH = 640
-DEFAULT_FRAME_HEIGHT = 480
-DEFAULT_FLIP_METHOD = 2
-SERIAL_HEADER = 223
-SERIAL_XOR = 233
+# Frames after which a detection is too old to lock onto
+MAX_DETECTION_AGE = 5
 
 class TrackingState(Enum):
     """Enumeration of tracking states."""
@@ -43,24 +54,48 @@ class TrackingState(Enum):
     TRACKING = 1
     LOST = 2
 
+class PID:
+    """Single-axis PID controller on a normalized error."""
+
+    def __init__(self, control):
+        """Initialize the controller.
+
+        Args:
+            control: ControlConfig holding kp, ki and kd
+        """
+        self.kp = control.kp
+        self.ki = control.ki
+        self.kd = control.kd
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the integral and derivative state."""
+        self._integral = 0.0
+        self._last_error = None
+        self._last_time = None
+
+    def update(self, error: float) -> float:
+        """Return the controller output for the given error."""
+        now = time.perf_counter()
+        dt = 0.0 if self._last_time is None else now - self._last_time
+        derivative = 0.0
+        if dt > 0:
+            self._integral += error * dt
+            derivative = (error - self._last_error) / dt
+        self._last_error = error
+        self._last_time = now
+        return self.kp * error + self.ki * self._integral + self.kd * derivative
+
 class ObjectTracker:
     """Main class for object tracking with stepper motor control."""
     
-    # Available OpenCV trackers
-    TRACKER_TYPES = {
-        "csrt": cv2.TrackerCSRT_create,
-        "kcf": cv2.TrackerKCF_create,
-        "boosting": cv2.TrackerBoosting_create,
-        "mil": cv2.TrackerMIL_create,
-        "tld": cv2.TrackerTLD_create,
-        "medianflow": cv2.TrackerMedianFlow_create,
-        "mosse": cv2.TrackerMOSSE_create
-    }
-    
     def __init__(self, video_source: Optional[str] = None, 
                  tracker_type: str = "kcf",
                  frame_width: int = DEFAULT_FRAME_WIDTH,
-                 frame_height: int = DEFAULT_FRAME_HEIGHT):
+                 frame_height: int = DEFAULT_FRAME_HEIGHT,
+                 config: Optional[Config] = None,
+                 detector: Optional[DetectionEngine] = None,
+                 source_id: str = "camera0"):
         """Initialize the object tracker.
         
         Args:
@@ -68,26 +103,228 @@ class ObjectTracker:
             tracker_type: Type of tracker to use (default: kcf)
             frame_width: Width of the camera frame
             frame_height: Height of the camera frame
+            config: Full configuration; overrides the individual arguments
+            detector: Detection engine shared with other trackers; by default
+                one is created if detector.model is configured
+            source_id: Identifies this tracker's frames to a shared detector
         """
-        self.tracker_type = tracker_type
-        self.frame_width = frame_width
-        self.frame_height = frame_height
-        self.tracker = self._create_tracker()
+        if config is None:
+            config = Config()
+            config.capture.video_source = video_source
+            config.capture.frame_width = frame_width
+            config.capture.frame_height = frame_height
+            config.tracker.tracker_type = tracker_type
+        self.config = config
+        self.tracker_type = self._available_tracker_type(config.tracker.tracker_type)
+        self.config.tracker.tracker_type = self.tracker_type
+        self.frame_width = config.capture.frame_width
+        self.frame_height = config.capture.frame_height
+        # Built when a target is locked
+        self.tracker = None
+        self.resolution_controller = self._create_resolution_controller()
+        self.tracker_scale = config.preprocess.tracker_scale
+        self.preprocessor = self._create_preprocessor()
+        self.tracker_frame = None
         self.bounding_box = None
         self.fps = FPS()
         self.running = False
         self.disable_tracking = False
+        # Set by an explicit unlock or disable; blocks auto-lock until a manual lock
+        self._auto_lock_suppressed = False
         self.serial_conn = None
-        self.video_source = video_source
+        self.video_source = config.capture.video_source
         self.cap = None
         self.serial_thread = None
+        self._serial_lock = threading.Lock()
+        self.datalink_conn = None
+        self.command_router = None
+        self.config_watcher = None
+        # Last config handed over by the watcher, to report back what was applied
+        self._requested_config = None
+        self.telemetry = None
+        self.frame_index = 0
+        self.last_command = (0, 0)
+        self._pending_configs = queue.Queue()
+        self._reinit_pending = False
+        self._pending_scale = None
+        # Whether bounding_box holds the target as of the latest frame
+        self._target_valid = False
+        self._pid_x = PID(config.control)
+        self._pid_y = PID(config.control)
+        self.calibration = self._load_calibration()
+        self.source_id = source_id
+        self.detections = []
+        self._owns_detector = detector is None
+        self.detector = detector if detector is not None else self._create_detector()
+    
+    def _available_tracker_type(self, name: str) -> str:
+        """Return ``name`` if it can be constructed, else KCF.
+        
+        Construction is tried once and the instance kept as a prebuilt spare
+        for the first lock, so trackers whose factory exists but fails (GOTURN
+        without its model files) are caught before they are needed.
+        """
+        if TRACKERS.is_available(name, construct=True):
+            return name
+        logger.warning(f"Tracker {name} not available. Using KCF.")
+        return "kcf"
     
     def _create_tracker(self):
         """Create and return a new tracker instance."""
-        if self.tracker_type not in self.TRACKER_TYPES:
-            logger.warning(f"Tracker {self.tracker_type} not found. Using KCF.")
+        try:
+            return TRACKERS.create(self.tracker_type)
+        except (TrackerUnavailableError, cv2.error) as e:
+            logger.warning(f"Tracker {self.tracker_type} not available ({e}). Using KCF.")
             self.tracker_type = "kcf"
-        return self.TRACKER_TYPES[self.tracker_type]()
+            self.config.tracker.tracker_type = self.tracker_type
+            self._sync_watcher()
+            return TRACKERS.create(self.tracker_type)
+    
+    def _create_preprocessor(self) -> Preprocessor:
+        """Create the preprocessor producing the display and tracker frames."""
+        pre = self.config.preprocess
+        preprocessor = build_preprocessor(self.frame_width, self.frame_height,
+                                          tracker_scale=self.tracker_scale,
+                                          tracker_grayscale=pre.tracker_grayscale,
+                                          clahe=pre.clahe,
+                                          clahe_clip_limit=pre.clahe_clip_limit,
+                                          clahe_tile_size=pre.clahe_tile_size)
+        if getattr(self, 'preprocessor', None) is not None:
+            # Keep counting time and allocations across rebuilds
+            preprocessor.stats = self.preprocessor.stats
+        return preprocessor
+    
+    def _create_resolution_controller(self) -> Optional[ResolutionController]:
+        """Create the adaptive tracker scale controller, if enabled."""
+        pre = self.config.preprocess
+        if not pre.adaptive:
+            return None
+        return ResolutionController(scale_ladder(pre.tracker_scale, pre.adaptive_min_scale),
+                                    target_fps=pre.adaptive_target_fps,
+                                    min_target_px=pre.adaptive_min_target_px,
+                                    max_target_px=pre.adaptive_max_target_px)
+    
+    def _adapt_resolution(self, frame_ms: float, tracking: bool) -> None:
+        """Pick the tracker scale for the next frame from the target size and processing time.
+        
+        The change is applied by _apply_tracker_scale() at the start of the
+        next frame, so a lock made later in this frame (e.g. by a key press)
+        is initialized at the scale its tracker frame was made with.
+        
+        Args:
+            frame_ms: Processing time of the current frame in milliseconds
+            tracking: Whether the target was tracked in this frame
+        """
+        if self.resolution_controller is None:
+            return
+        scale = self.resolution_controller.update(self.bounding_box if tracking else None, frame_ms)
+        self._pending_scale = scale if scale != self.tracker_scale else None
+    
+    def _apply_tracker_scale(self) -> None:
+        """Switch to the tracker scale chosen on the previous frame.
+        
+        The bounding box is kept in display coordinates, so a tracked target
+        is re-initialized at the new scale and the normalized dx/dy sent to
+        the gimbal are unaffected. A lost target's last box is stale, so the
+        tracker is reset instead of being re-initialized on it.
+        """
+        if self._pending_scale is None:
+            return
+        self.tracker_scale, self._pending_scale = self._pending_scale, None
+        self.preprocessor = self._create_preprocessor()
+        self._keep_target("tracker scale change")
+    
+    def _keep_target(self, reason: str) -> None:
+        """Carry the target over a tracker rebuild.
+        
+        A tracked target is re-initialized on the next tracker frame. A lost one is
+        dropped, as re-initializing on its stale last box would fake a lock.
+        
+        Args:
+            reason: What rebuilt the tracker, for the log
+        """
+        if self.bounding_box is None:
+            return
+        if self._target_valid:
+            self._reinit_pending = True
+        else:
+            self._clear_target()
+            logger.info(f"Lost target dropped on {reason}")
+    
+    def _create_detector(self) -> Optional[DetectionEngine]:
+        """Create a detection engine if a detector model is configured."""
+        det = self.config.detector
+        if not det.model:
+            return None
+        try:
+            return DetectionEngine(det.model, backend=det.backend,
+                                   input_size=(det.input_width, det.input_height),
+                                   fp16=det.fp16, threads=det.threads,
+                                   max_batch=det.max_batch,
+                                   conf_threshold=det.conf_threshold,
+                                   nms_threshold=det.nms_threshold)
+        except (cv2.error, ImportError, OSError) as e:
+            logger.error(f"Failed to load detector {det.model}: {e}")
+            return None
+    
+    def _update_detections(self, frame: np.ndarray) -> None:
+        """Submit the frame for detection and pick up the newest results.
+        
+        Never waits for inference; results arrive a frame or more later.
+        
+        Args:
+            frame: Display frame
+        """
+        if self.detector is None:
+            return
+        if self.frame_index % self.config.detector.interval == 0:
+            self.detector.submit(self.source_id, self.frame_index, frame)
+        latest = self.detector.latest(self.source_id)
+        if latest is None:
+            return
+        frame_id, self.detections = latest
+        fresh = self.frame_index - frame_id <= MAX_DETECTION_AGE
+        idle = self.bounding_box is None and not self._auto_lock_suppressed
+        if self.config.detector.auto_lock and idle and fresh and self.detections:
+            self._start_tracking(self.detections[0].bbox)
+    
+    def _load_calibration(self) -> Optional[CameraCalibration]:
+        """Load the lens calibration used for aiming, if one is configured."""
+        path = self.config.control.calibration
+        if not path:
+            return None
+        try:
+            calibration = CameraCalibration.load(path)
+            # Build the aiming LUT now rather than on the first motor command
+            calibration.lut(self.frame_width, self.frame_height)
+        except (OSError, KeyError, ValueError, cv2.error) as e:
+            logger.error(f"Failed to load calibration {path}, aiming uncorrected: {e}")
+            return None
+        logger.info(f"Loaded lens calibration from {path}")
+        return calibration
+    
+    def _aim_lut(self) -> Optional[AimLUT]:
+        """Return the pixel -> angle LUT for the current frame size, if calibrated."""
+        if self.calibration is None:
+            return None
+        return self.calibration.lut(self.frame_width, self.frame_height)
+    
+    def _tracker_scale(self) -> Tuple[float, float]:
+        """Return the (x, y) scale from display to tracker coordinates."""
+        spec = self.preprocessor.spec("tracker")
+        return spec.width / self.frame_width, spec.height / self.frame_height
+    
+    def _to_tracker(self, box: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """Convert a display-frame bounding box to tracker-frame coordinates."""
+        sx, sy = self._tracker_scale()
+        x, y, w, h = box
+        return (int(x * sx), int(y * sy), max(1, int(w * sx)), max(1, int(h * sy)))
+    
+    def _to_display(self, box: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+        """Convert a tracker-frame bounding box to display-frame coordinates."""
+        sx, sy = self._tracker_scale()
+        x, y, w, h = box
+        return (int(x / sx), int(y / sy), int(w / sx), int(h / sy))
     
     def init_serial_connection(self) -> bool:
         """Initialize serial connection to Arduino.
@@ -97,12 +334,14 @@ class ObjectTracker:
         """
         try:
             # Set system permissions for serial device
+            serial_config = self.config.serial
             if os.name == 'posix':
-                os.system(f"sudo chmod 777 {SERIAL_DEVICE}")
+                os.system(f"sudo chmod 777 {serial_config.device}")
                 os.system("sudo systemctl restart nvargus-daemon")
             
-            self.serial_conn = serial.Serial(SERIAL_DEVICE, DEFAULT_BAUDRATE, timeout=1)
-            logger.info(f"Connected to Arduino on {SERIAL_DEVICE}")
+            self.serial_conn = serial.Serial(serial_config.device, serial_config.baudrate,
+                                             timeout=serial_config.timeout)
+            logger.info(f"Connected to Arduino on {serial_config.device}")
             
             # Start serial read thread
             self.running = True
@@ -117,12 +356,82 @@ class ObjectTracker:
             logger.error(f"Failed to connect to Arduino: {e}")
             return False
     
+    def init_datalink(self) -> bool:
+        """Open the joystick datalink and start routing its commands.
+        
+        Does nothing if no datalink device is configured.
+        
+        Returns:
+            bool: True if the datalink is running or not configured
+        """
+        serial_config = self.config.serial
+        if not serial_config.datalink_device:
+            return True
+        try:
+            self.datalink_conn = serial.Serial(serial_config.datalink_device,
+                                               serial_config.datalink_baudrate,
+                                               timeout=serial_config.timeout)
+        except serial.SerialException as e:
+            logger.error(f"Failed to connect to datalink: {e}")
+            return False
+        logger.info(f"Connected to datalink on {serial_config.datalink_device}")
+        
+        self.command_router = CommandRouter(
+            self.datalink_conn,
+            gimbal_write=self._write_serial,
+            is_locked=lambda: self.bounding_box is not None and not self.disable_tracking,
+            on_unlock=self._stop_motor_commands,
+            max_latency_ms=serial_config.datalink_max_latency_ms,
+            unlock_exit_count=serial_config.datalink_unlock_exit_count
+        )
+        self.command_router.start()
+        return True
+    
+    def _stop_motor_commands(self) -> None:
+        """Stop sending motor commands until the next lock; safe from any thread."""
+        self._auto_lock_suppressed = True
+        self.disable_tracking = True
+    
+    def _apply_datalink_commands(self) -> bool:
+        """Apply lock/unlock commands received since the last frame.
+        
+        Returns:
+            bool: False if the datalink requested an exit
+        """
+        if self.command_router is None:
+            return True
+        for command in self.command_router.pending():
+            if command.type is CommandType.LOCK:
+                if self.bounding_box is None or self.disable_tracking:
+                    self._lock_center()
+            elif command.type is CommandType.UNLOCK:
+                self._reset_tracker()
+            self.command_router.applied(command)
+            if command.type is CommandType.EXIT:
+                logger.info("Exit requested via datalink")
+                return False
+        return True
+    
+    def _write_serial(self, data: bytes) -> None:
+        """Write to the Arduino; safe to call from any thread.
+        
+        Args:
+            data: Bytes to send
+        """
+        conn = self.serial_conn
+        if not conn or not conn.is_open:
+            return
+        with self._serial_lock:
+            conn.write(data)
+    
     def _read_serial_data(self):
         """Background thread to read data from Arduino."""
-        while self.running and self.serial_conn and self.serial_conn.is_open:
+        conn = self.serial_conn
+        while self.running and conn is self.serial_conn and conn.is_open:
             try:
-                data = self.serial_conn.read()
+                data = conn.read()
                 if data == b'\xa5':
+                    self._auto_lock_suppressed = True
                     self.disable_tracking = True
                     logger.info("Tracking disabled via serial command")
             except Exception as e:
@@ -159,6 +468,15 @@ class ObjectTracker:
             logger.error(f"Failed to initialize video source: {e}")
             return False
     
+    def start_telemetry(self, path: str) -> None:
+        """Record every frame's bbox, state and motor command to a telemetry log.
+        
+        Args:
+            path: Output file, read back with telemetry_query.py
+        """
+        self.telemetry = TelemetryWriter(path)
+        logger.info(f"Recording telemetry to {path}")
+    
     def _send_motor_commands(self, x: int, y: int) -> None:
         """Send motor control commands to Arduino.
         
@@ -166,20 +484,32 @@ class ObjectTracker:
             x: X coordinate of the target
             y: Y coordinate of the target
         """
-        if not self.serial_conn or not self.serial_conn.is_open:
+        if not self.serial_conn or not self.serial_conn.is_open or self.disable_tracking:
             return
         
         try:
             # Calculate normalized coordinates (-1.0 to 1.0)
             width_center = self.frame_width / 2.0
             height_center = self.frame_height / 2.0
+            control = self.config.control
+            
+            lut = self._aim_lut()
+            if lut is not None:
+                error_x, error_y = lut.normalized(x, y)
+            else:
+                error_x = (x - width_center) / width_center
+                error_y = (height_center - y) / height_center
             
-            dx = int(((x - width_center) / width_center) * 127)
-            dy = int(((height_center - y) / height_center) * 127)
+            dx = int(self._pid_x.update(error_x) * control.gain)
+            dy = int(self._pid_y.update(error_y) * control.gain)
+            dx = max(-32768, min(32767, dx))
+            dy = max(-32768, min(32767, dy))
             
             # Pack data: header (1B), dx (2B), dy (2B), xor (1B)
-            data = pack('<BhhB', SERIAL_HEADER, dx, dy, SERIAL_XOR)
-            self.serial_conn.write(data)
+            serial_config = self.config.serial
+            data = pack('<BhhB', serial_config.header, dx, dy, serial_config.xor)
+            self._write_serial(data)
+            self.last_command = (dx, dy)
             
         except Exception as e:
             logger.error(f"Error sending motor commands: {e}")
@@ -190,6 +520,10 @@ class ObjectTracker:
             logger.error("Failed to initialize serial connection")
             return
             
+        if not self.init_datalink():
+            logger.error("Failed to initialize datalink")
+            return
+            
         if not self.init_video_capture():
             logger.error("Failed to initialize video source")
             return
@@ -210,16 +544,35 @@ class ObjectTracker:
                 if frame is None:
                     logger.warning("Empty frame received")
                     continue
+                frame_start = time.perf_counter()
+                
+                # Apply config and scale changes between frames so the lock is kept
+                self._apply_pending_configs()
+                self._apply_tracker_scale()
+                
+                # Display and tracker representations in one pass
+                outputs = self.preprocessor.process(frame)
+                frame = outputs["display"]
+                self.tracker_frame = outputs["tracker"]
+                if self._reinit_pending:
+                    self._reinit_tracker()
+                
+                # Lock/unlock from the datalink take effect on this frame
+                if not self._apply_datalink_commands():
+                    break
                 
-                # Resize frame if needed
-                frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+                self._update_detections(frame)
                 
                 # Process frame based on tracking state
+                state = TrackingState.IDLE
+                self.last_command = (0, 0)
                 if self.bounding_box is not None and not self.disable_tracking:
-                    success, bbox = self.tracker.update(frame)
+                    success, bbox = self.tracker.update(self.tracker_frame)
+                    state = TrackingState.TRACKING if success else TrackingState.LOST
                     
                     if success:
-                        x, y, w, h = [int(v) for v in bbox]
+                        x, y, w, h = self._to_display(bbox)
+                        self.bounding_box = (x, y, w, h)
                         center_x, center_y = x + w//2, y + h//2
                         
                         # Draw bounding box and center point
@@ -238,6 +591,23 @@ class ObjectTracker:
                         cv2.putText(frame, status, (10, 30), 
                                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
                 
+                self._target_valid = state is TrackingState.TRACKING
+                
+                # Draw detections
+                for det in self.detections:
+                    cv2.rectangle(frame, (det.x, det.y), (det.x + det.w, det.y + det.h),
+                                  (255, 128, 0), 1)
+                
+                if self.telemetry is not None:
+                    tracked = state is TrackingState.TRACKING
+                    self.telemetry.log(self.frame_index,
+                                       self.bounding_box if tracked else None,
+                                       1.0 if tracked else 0.0,
+                                       state.value, *self.last_command)
+                self.frame_index += 1
+                self._adapt_resolution((time.perf_counter() - frame_start) * 1000.0,
+                                       state is TrackingState.TRACKING)
+                
                 # Show the frame
                 cv2.imshow("Object Tracker", frame)
                 
@@ -250,6 +620,9 @@ class ObjectTracker:
                 # 's' to select ROI
                 elif key == ord('s'):
                     self._select_roi(frame)
+                # 'l' to lock on the box at the frame center
+                elif key == ord('l'):
+                    self._lock_center()
                 # 'd' to reset tracker
                 elif key == ord('d'):
                     self._reset_tracker()
@@ -262,6 +635,158 @@ class ObjectTracker:
         finally:
             self.cleanup()
     
+    def start_config_watcher(self, path: Optional[str] = None,
+                             control_port: Optional[int] = None,
+                             overrides: Optional[Dict[str, Any]] = None) -> None:
+        """Apply config changes live from a file and/or a local control socket.
+        
+        Args:
+            path: Config file to watch
+            control_port: UDP port on localhost accepting JSON patches
+            overrides: Patch re-applied to every reload of the file, so
+                command line options keep overriding it
+        """
+        self._requested_config = copy.deepcopy(self.config)
+        self.config_watcher = ConfigWatcher(
+            self._requested_config, self.request_config, path=path, control_port=control_port,
+            overrides=overrides
+        )
+        self.config_watcher.start()
+    
+    def request_config(self, config: Config) -> None:
+        """Queue a new configuration to be applied before the next frame.
+        
+        Safe to call from any thread.
+        
+        Args:
+            config: Validated configuration
+        """
+        self._pending_configs.put(config)
+    
+    def _apply_pending_configs(self) -> None:
+        """Apply queued configuration changes."""
+        while True:
+            try:
+                config = self._pending_configs.get_nowait()
+            except queue.Empty:
+                return
+            self.apply_config(config)
+    
+    def apply_config(self, config: Config) -> None:
+        """Apply a new configuration, rebuilding only the affected components.
+        
+        If a target is tracked, the tracker is re-initialized with the current
+        bounding box on the next frame, so the lock survives frame size,
+        preprocessing and tracker type changes. A lost target is dropped.
+        
+        Args:
+            config: Validated configuration
+        """
+        old = self.config
+        changed = changed_sections(old, config)
+        self._requested_config = config
+        self.config = copy.deepcopy(config)
+        rebuild_preprocessor = "preprocess" in changed
+        
+        if "capture" in changed:
+            if config.capture.video_source != old.capture.video_source:
+                logger.warning("capture.video_source changes require a restart")
+                self.config.capture.video_source = old.capture.video_source
+            new_size = (config.capture.frame_width, config.capture.frame_height)
+            if new_size != (self.frame_width, self.frame_height):
+                scale_x = new_size[0] / self.frame_width
+                scale_y = new_size[1] / self.frame_height
+                if self.bounding_box is not None:
+                    x, y, w, h = self.bounding_box
+                    self.bounding_box = (int(x * scale_x), int(y * scale_y),
+                                         int(w * scale_x), int(h * scale_y))
+                self.frame_width, self.frame_height = new_size
+                rebuild_preprocessor = True
+                if self.calibration is not None and \
+                        config.control.calibration == old.control.calibration:
+                    self.calibration.lut(*new_size)
+                logger.info(f"Frame size set to {new_size[0]}x{new_size[1]}")
+        
+        if "preprocess" in changed:
+            self.resolution_controller = self._create_resolution_controller()
+            self.tracker_scale = config.preprocess.tracker_scale
+            self._pending_scale = None
+        
+        if rebuild_preprocessor:
+            self.preprocessor = self._create_preprocessor()
+            self._keep_target("config change")
+        
+        if "tracker" in changed and config.tracker.tracker_type != self.tracker_type:
+            self.tracker_type = self._available_tracker_type(config.tracker.tracker_type)
+            # Built by the re-init or the next lock, not here as well
+            self.tracker = None
+            self.config.tracker.tracker_type = self.tracker_type
+            self._keep_target("tracker type change")
+            logger.info(f"Tracker type set to {self.tracker_type}")
+        
+        if "detector" in changed and self._owns_detector:
+            if self.detector is not None:
+                self.detector.stop()
+            self.detector = self._create_detector()
+            self.detections = []
+        
+        if "control" in changed:
+            self._pid_x = PID(config.control)
+            self._pid_y = PID(config.control)
+            if config.control.calibration != old.control.calibration:
+                self.calibration = self._load_calibration()
+        
+        if "serial" in changed:
+            old_link = (old.serial.device, old.serial.baudrate, old.serial.timeout)
+            new_link = (config.serial.device, config.serial.baudrate, config.serial.timeout)
+            if new_link != old_link and self.serial_conn is not None:
+                self._reopen_serial_connection()
+            old_datalink = (old.serial.datalink_device, old.serial.datalink_baudrate)
+            if (config.serial.datalink_device, config.serial.datalink_baudrate) != old_datalink:
+                logger.warning("serial.datalink_device/datalink_baudrate changes require a restart")
+                self.config.serial.datalink_device = old.serial.datalink_device
+                self.config.serial.datalink_baudrate = old.serial.datalink_baudrate
+            if self.command_router is not None:
+                self.command_router.max_latency_ms = config.serial.datalink_max_latency_ms
+                self.command_router.unlock_exit_count = config.serial.datalink_unlock_exit_count
+        
+        self._sync_watcher()
+    
+    def _sync_watcher(self) -> None:
+        """Tell the config watcher which settings are actually in effect."""
+        if self.config_watcher is not None and self._requested_config is not None:
+            self.config_watcher.applied(self._requested_config, copy.deepcopy(self.config))
+    
+    def _reinit_tracker(self) -> None:
+        """Re-initialize the tracker on the current target after a config change."""
+        self._reinit_pending = False
+        if self.bounding_box is None:
+            return
+        self.tracker = self._create_tracker()
+        self.tracker.init(self.tracker_frame, self._to_tracker(self.bounding_box))
+        logger.info(f"Tracker re-initialized with ROI: {self.bounding_box}")
+    
+    def _reopen_serial_connection(self) -> None:
+        """Reopen the serial link with the current serial settings."""
+        serial_config = self.config.serial
+        try:
+            new_conn = serial.Serial(serial_config.device, serial_config.baudrate,
+                                     timeout=serial_config.timeout)
+        except serial.SerialException as e:
+            logger.error(f"Failed to reopen serial connection, keeping the old one: {e}")
+            return
+        with self._serial_lock:
+            old_conn, self.serial_conn = self.serial_conn, new_conn
+        if self.serial_thread is not None and self.serial_thread.is_alive():
+            # The reader exits once it sees the connection was replaced
+            self.serial_thread.join(timeout=old_conn.timeout or 1.0)
+        if old_conn.is_open:
+            old_conn.close()
+        logger.info(f"Serial connection moved to {serial_config.device}")
+        self.serial_thread = threading.Thread(target=self._read_serial_data)
+        self.serial_thread.daemon = True
+        self.serial_thread.start()
+    
     def _select_roi(self, frame: np.ndarray) -> None:
         """Select region of interest for tracking.
         
@@ -270,37 +795,92 @@ class ObjectTracker:
         """
         roi = cv2.selectROI("Select Object to Track", frame, fromCenter=False, showCrosshair=True)
         if roi != (0, 0, 0, 0):  # Check if a valid ROI was selected
-            self.bounding_box = roi
-            self.tracker = self._create_tracker()
-            self.tracker.init(frame, self.bounding_box)
-            self.disable_tracking = False
-            logger.info(f"Tracking initialized with ROI: {roi}")
+            self._auto_lock_suppressed = False
+            self._start_tracking(tuple(roi))
         cv2.destroyWindow("Select Object to Track")
     
-    def _reset_tracker(self) -> None:
-        """Reset the tracker to idle state."""
+    def _lock_center(self) -> None:
+        """Start tracking the configured ROI box at the frame center."""
+        w, h = self.config.tracker.roi_size
+        self._auto_lock_suppressed = False
+        self._start_tracking(((self.frame_width - w) // 2, (self.frame_height - h) // 2, w, h))
+    
+    def _start_tracking(self, roi: Tuple[int, int, int, int]) -> None:
+        """Initialize a new tracker on a display-frame ROI.
+        
+        Args:
+            roi: (x, y, w, h) in display-frame pixels
+        """
+        start = time.perf_counter()
+        self.bounding_box = roi
         self.tracker = self._create_tracker()
-        self.bounding_box = None
+        self.tracker.init(self.tracker_frame, self._to_tracker(self.bounding_box))
+        self._reset_pids()
+        self._target_valid = True
+        self.disable_tracking = False
+        lock_ms = (time.perf_counter() - start) * 1000.0
+        logger.info(f"Tracking initialized with ROI: {roi} in {lock_ms:.1f} ms")
+    
+    def _reset_tracker(self) -> None:
+        """Reset the tracker to idle state on an operator unlock."""
+        self._clear_target()
+        self._auto_lock_suppressed = True
         logger.info("Tracker reset")
     
+    def _clear_target(self) -> None:
+        """Drop the current target and return to the idle state."""
+        # The next lock creates its own tracker; building one here would
+        # only take the prebuilt spare and start another refill
+        self.tracker = None
+        self.bounding_box = None
+        self._target_valid = False
+        self._reset_pids()
+    
+    def _reset_pids(self) -> None:
+        """Clear the PID state so it does not carry over to the next target."""
+        self._pid_x.reset()
+        self._pid_y.reset()
+    
     def cleanup(self) -> None:
         """Clean up resources."""
         self.running = False
         self.fps.stop()
         
+        # Stop watching for config changes
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+        
         # Stop video capture
-        if hasattr(self, 'cap'):
+        if getattr(self, 'cap', None) is not None:
             if isinstance(self.cap, VideoStream):
                 self.cap.stop()
             else:
                 self.cap.release()
         
+        # Stop the detector if this tracker created it
+        if getattr(self, 'detector', None) is not None and self._owns_detector:
+            self.detector.stop()
+            self.detector = None
+        
+        # Flush the telemetry log
+        if getattr(self, 'telemetry', None) is not None:
+            self.telemetry.close()
+            self.telemetry = None
+        
+        # Stop routing datalink commands
+        if getattr(self, 'command_router', None) is not None:
+            self.command_router.stop()
+            self.command_router = None
+        if getattr(self, 'datalink_conn', None) is not None and self.datalink_conn.is_open:
+            self.datalink_conn.close()
+        
         # Close serial connection
         if hasattr(self, 'serial_conn') and self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
         
         # Wait for serial thread to finish
-        if hasattr(self, 'serial_thread') and self.serial_thread.is_alive():
+        if getattr(self, 'serial_thread', None) is not None and self.serial_thread.is_alive():
             self.serial_thread.join(timeout=1.0)
         
         cv2.destroyAllWindows()
@@ -308,6 +888,9 @@ class ObjectTracker:
         # Log FPS information
         logger.info(f"Elapsed time: {self.fps.elapsed():.2f} seconds")
         logger.info(f"Approx. FPS: {self.fps.fps():.2f}")
+        stats = self.preprocessor.stats
+        logger.info(f"Preprocessing: {stats.mean_ms:.2f} ms/frame, "
+                    f"{stats.allocated_bytes / 1024:.1f} KiB allocated in {stats.allocations} buffers")
         logger.info("Cleanup complete")
 
 def parse_arguments():
@@ -317,6 +900,24 @@ def parse_arguments():
         argparse.Namespace: Parsed command line arguments
     """
     parser = argparse.ArgumentParser(description="Object Tracker with Stepper Motor Control")
+    parser.add_argument(
+        "-c", "--config", 
+        type=str, 
+        default=None,
+        help="path to JSON config file, reloaded live when it changes (optional)"
+    )
+    parser.add_argument(
+        "--control-port", 
+        type=int, 
+        default=None,
+        help=f"UDP port on localhost accepting live config patches (e.g. {DEFAULT_CONTROL_PORT})"
+    )
+    parser.add_argument(
+        "--telemetry", 
+        type=str, 
+        default=None,
+        help="record per-frame telemetry to this file (optional)"
+    )
     parser.add_argument(
         "-v", "--video", 
         type=str, 
@@ -326,38 +927,74 @@ def parse_arguments():
     parser.add_argument(
         "-t", "--tracker", 
         type=str, 
-        default="kcf",
-        choices=["csrt", "kcf", "boosting", "mil", "tld", "medianflow", "mosse"],
-        help="OpenCV object tracker type (default: kcf)"
+        default=None,
+        choices=TRACKERS.names(),
+        help="object tracker type (default: kcf); see tracker_registry.py for availability"
     )
     parser.add_argument(
         "--width", 
         type=int, 
-        default=DEFAULT_FRAME_WIDTH,
+        default=None,
         help=f"frame width (default: {DEFAULT_FRAME_WIDTH})"
     )
     parser.add_argument(
         "--height", 
         type=int, 
-        default=DEFAULT_FRAME_HEIGHT,
+        default=None,
         help=f"frame height (default: {DEFAULT_FRAME_HEIGHT})"
     )
     return parser.parse_args()
 
+def cli_overrides(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """Return the command line options that override the config file, as a patch.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: Config patch for merge_patch()
+    """
+    patch = {"capture": {}, "tracker": {}}
+    if args.video is not None:
+        patch["capture"]["video_source"] = args.video
+    if args.tracker is not None:
+        patch["tracker"]["tracker_type"] = args.tracker
+    if args.width is not None:
+        patch["capture"]["frame_width"] = args.width
+    if args.height is not None:
+        patch["capture"]["frame_height"] = args.height
+    return {name: values for name, values in patch.items() if values}
+
+def build_config(args: argparse.Namespace) -> Config:
+    """Load the config file, if any, and apply command line overrides.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Config: Validated configuration
+    """
+    config = load_config(args.config) if args.config else Config()
+    return merge_patch(config, cli_overrides(args))
+
 def main():
     """Main function to run the object tracker."""
     args = parse_arguments()
+    try:
+        config = build_config(args)
+    except (OSError, ConfigError) as e:
+        logger.error(f"Invalid configuration: {e}")
+        sys.exit(1)
     
     logger.info("Starting Object Tracker")
-    logger.info(f"Tracker type: {args.tracker}")
-    logger.info(f"Frame size: {args.width}x{args.height}")
-    
-    tracker = ObjectTracker(
-        video_source=args.video,
-        tracker_type=args.tracker,
-        frame_width=args.width,
-        frame_height=args.height
-    )
+    logger.info(f"Tracker type: {config.tracker.tracker_type}")
+    logger.info(f"Frame size: {config.capture.frame_width}x{config.capture.frame_height}")
+    
+    tracker = ObjectTracker(config=config)
+    if args.telemetry:
+        tracker.start_telemetry(args.telemetry)
+    if args.config or args.control_port is not None:
+        tracker.start_config_watcher(args.config, args.control_port, cli_overrides(args))
     
     try:
         tracker.run()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Frame preprocessing
+
+Produces every representation the consumers of a frame need (e.g. gray
+at tracker scale, BGR at display scale) from one captured frame. Each
+distinct output size is resampled once, color conversion and optional
+CLAHE run on the small image, and all results are written into buffers
+that are preallocated and reused across frames.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutputSpec:
+    """One representation produced for each frame."""
+    name: str
+    width: int
+    height: int
+    gray: bool = False
+    clahe: bool = False
+
+
+@dataclass
+class PreprocessStats:
+    """Per-frame cost of preprocessing."""
+    frames: int = 0
+    total_ms: float = 0.0
+    last_ms: float = 0.0
+    allocations: int = 0
+    allocated_bytes: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        """Mean preprocessing time per frame in milliseconds."""
+        return self.total_ms / self.frames if self.frames else 0.0
+
+
+class Preprocessor:
+    """Single-pass frame preprocessor with preallocated output buffers."""
+
+    def __init__(self, outputs: List[OutputSpec],
+                 clahe_clip_limit: float = 2.0,
+                 clahe_tile_size: int = 8):
+        """Initialize the preprocessor.
+
+        Args:
+            outputs: Representations to produce; names must be unique
+            clahe_clip_limit: CLAHE contrast limit
+            clahe_tile_size: CLAHE grid size in tiles per side
+        """
+        names = [spec.name for spec in outputs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate output names: {names}")
+        self.outputs = outputs
+        self.stats = PreprocessStats()
+        self._clahe = None
+        if any(spec.clahe for spec in outputs):
+            self._clahe = cv2.createCLAHE(clipLimit=clahe_clip_limit,
+                                          tileGridSize=(clahe_tile_size, clahe_tile_size))
+        self._buffers: Dict[Tuple, np.ndarray] = {}
+        self._source_shape: Optional[Tuple[int, ...]] = None
+
+    def _buffer(self, key: Tuple, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return the buffer for ``key``, allocating it on first use."""
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[key] = buf
+            self.stats.allocations += 1
+            self.stats.allocated_bytes += buf.nbytes
+        return buf
+
+    def process(self, frame: np.ndarray) -> Dict[str, np.ndarray]:
+        """Produce every configured representation of a BGR frame.
+
+        The returned arrays are reused by the next call; copy them to keep
+        them across frames.
+
+        Args:
+            frame: BGR frame at capture resolution
+
+        Returns:
+            Dict[str, np.ndarray]: Output name to image
+        """
+        start = time.perf_counter()
+        if frame.shape != self._source_shape:
+            if self._source_shape is not None:
+                logger.info(f"Capture size changed to {frame.shape[1]}x{frame.shape[0]}")
+            self._source_shape = frame.shape
+
+        src_h, src_w = frame.shape[:2]
+        resized: Dict[Tuple[int, int], np.ndarray] = {}
+        claimed = set()
+        results: Dict[str, np.ndarray] = {}
+        for spec in self.outputs:
+            size = (spec.width, spec.height)
+            bgr = resized.get(size)
+            if bgr is None:
+                if size == (src_w, src_h):
+                    bgr = frame
+                else:
+                    interpolation = (cv2.INTER_AREA if spec.width < src_w
+                                     else cv2.INTER_LINEAR)
+                    bgr = self._buffer(("bgr", size), (spec.height, spec.width, 3))
+                    cv2.resize(frame, size, dst=bgr, interpolation=interpolation)
+                resized[size] = bgr
+
+            if spec.gray:
+                out = self._buffer(("out", spec.name), (spec.height, spec.width))
+                cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY, dst=out)
+                if spec.clahe:
+                    self._clahe.apply(out, dst=out)
+            elif spec.clahe:
+                lab = self._buffer(("lab", size), (spec.height, spec.width, 3))
+                light = self._buffer(("light", size), (spec.height, spec.width))
+                out = self._buffer(("out", spec.name), (spec.height, spec.width, 3))
+                cv2.cvtColor(bgr, cv2.COLOR_BGR2LAB, dst=lab)
+                cv2.extractChannel(lab, 0, dst=light)
+                self._clahe.apply(light, dst=light)
+                cv2.insertChannel(light, lab, 0)
+                cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=out)
+            elif bgr is not frame and size not in claimed:
+                # The first plain BGR output at a size owns the resize buffer
+                out = bgr
+                claimed.add(size)
+            else:
+                out = self._buffer(("out", spec.name), (spec.height, spec.width, 3))
+                np.copyto(out, bgr)
+            results[spec.name] = out
+
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.stats.frames += 1
+        self.stats.total_ms += elapsed
+        self.stats.last_ms = elapsed
+        return results
+
+    def spec(self, name: str) -> OutputSpec:
+        """Return the output spec named ``name``."""
+        for spec in self.outputs:
+            if spec.name == name:
+                return spec
+        raise KeyError(name)
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Bytes currently held in preallocated buffers."""
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+
+def build_preprocessor(frame_width: int, frame_height: int,
+                       tracker_scale: float = 1.0,
+                       tracker_grayscale: bool = False,
+                       clahe: bool = False,
+                       clahe_clip_limit: float = 2.0,
+                       clahe_tile_size: int = 8) -> Preprocessor:
+    """Build the "display" and "tracker" outputs used by ObjectTracker.
+
+    Args:
+        frame_width: Display width
+        frame_height: Display height
+        tracker_scale: Tracker resolution relative to the display
+        tracker_grayscale: Feed the tracker a gray image
+        clahe: Apply CLAHE to the tracker image
+        clahe_clip_limit: CLAHE contrast limit
+        clahe_tile_size: CLAHE grid size in tiles per side
+
+    Returns:
+        Preprocessor: Preprocessor producing "display" and "tracker"
+    """
+    tracker_width = max(1, int(round(frame_width * tracker_scale)))
+    tracker_height = max(1, int(round(frame_height * tracker_scale)))
+    return Preprocessor([
+        OutputSpec("display", frame_width, frame_height),
+        OutputSpec("tracker", tracker_width, tracker_height,
+                   gray=tracker_grayscale, clahe=clahe),
+    ], clahe_clip_limit=clahe_clip_limit, clahe_tile_size=clahe_tile_size)
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Measure preprocessing cost on a video")
+    parser.add_argument("video", type=str, help="path to input video file")
+    parser.add_argument("--width", type=int, default=640, help="display width (default: 640)")
+    parser.add_argument("--height", type=int, default=480, help="display height (default: 480)")
+    parser.add_argument("--scale", type=float, default=0.5,
+                        help="tracker scale relative to the display (default: 0.5)")
+    parser.add_argument("--gray", action="store_true", help="gray tracker image")
+    parser.add_argument("--clahe", action="store_true", help="apply CLAHE to the tracker image")
+    parser.add_argument("--frames", type=int, default=500,
+                        help="number of frames to measure (default: 500)")
+    return parser.parse_args()
+
+
+def main():
+    """Report per-frame time and allocations for a preprocessing setup."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_arguments()
+    preprocessor = build_preprocessor(args.width, args.height, args.scale,
+                                      args.gray, args.clahe)
+    cap = cv2.VideoCapture(args.video)
+    try:
+        while preprocessor.stats.frames < args.frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            preprocessor.process(frame)
+    finally:
+        cap.release()
+
+    stats = preprocessor.stats
+    logger.info(f"Frames: {stats.frames}")
+    logger.info(f"Mean time per frame: {stats.mean_ms:.3f} ms")
+    logger.info(f"Buffer allocations: {stats.allocations} "
+                f"({stats.allocated_bytes / 1024:.1f} KiB total, "
+                f"{preprocessor.buffer_bytes / 1024:.1f} KiB held)")
+
+
+if __name__ == "__main__":
+    main()
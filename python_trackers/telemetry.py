@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Trajectory and telemetry log
+
+Append-only binary log with one fixed-size record per frame, written
+through a memory map by a background thread so the tracking loop never
+blocks on disk. The file is a 64-byte header followed by packed records
+(see RECORD_DTYPE); telemetry_query.py slices, aggregates and plots it.
+"""
+
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NVATLM01"
+VERSION = 2
+HEADER_SIZE = 64
+# magic, version, record size, record count, session start (unix wall time)
+HEADER_FORMAT = "<8sIIQd"
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # seconds since session start, monotonic clock
+    ("frame", "<u4"),       # frame index since start
+    ("x", "<f4"),           # bounding box in frame pixels, NaN when not tracking
+    ("y", "<f4"),
+    ("w", "<f4"),
+    ("h", "<f4"),
+    ("confidence", "<f4"),  # tracker confidence, 1.0/0.0 for OpenCV trackers
+    ("state", "u1"),        # TrackingState value
+    ("dx", "<i2"),          # motor command sent, 0 when none
+    ("dy", "<i2"),
+])
+
+
+class TelemetryWriter:
+    """Non-blocking writer for the telemetry log."""
+
+    def __init__(self, path: str,
+                 chunk_records: int = 65536,
+                 queue_size: int = 8192,
+                 flush_interval: float = 1.0):
+        """Create the log file and start the writer thread.
+
+        Args:
+            path: Output file; overwritten if it exists
+            chunk_records: Records the file grows by when the map is full
+            queue_size: Records buffered before new ones are dropped
+            flush_interval: Seconds between flushes of the map to disk
+        """
+        self.path = path
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        # Wall time only labels the session; record times come from the
+        # monotonic clock so they stay sorted across wall clock steps (NTP)
+        self.start_time = time.time()
+        self._start_monotonic = time.monotonic()
+        self.count = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._capacity = 0
+        self._map = None
+
+        with open(path, "wb") as f:
+            f.write(self._header())
+        self._grow()
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _header(self) -> bytes:
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, RECORD_DTYPE.itemsize,
+                             self.count, self.start_time)
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _grow(self) -> None:
+        """Extend the file by one chunk and remap it."""
+        if self._map is not None:
+            self._map.flush()
+            del self._map
+        self._capacity += self.chunk_records
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self._capacity * RECORD_DTYPE.itemsize)
+        self._map = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r+",
+                              offset=HEADER_SIZE, shape=(self._capacity,))
+
+    def log(self, frame: int, bbox: Optional[Tuple[float, float, float, float]],
+            confidence: float, state: int, dx: int = 0, dy: int = 0) -> bool:
+        """Queue one frame record; never blocks.
+
+        Args:
+            frame: Frame index
+            bbox: (x, y, w, h) or None when not tracking
+            confidence: Tracker confidence
+            state: TrackingState value
+            dx: Horizontal motor command sent
+            dy: Vertical motor command sent
+
+        Returns:
+            bool: False if the record was dropped because the queue is full
+        """
+        if bbox is None:
+            bbox = (np.nan, np.nan, np.nan, np.nan)
+        try:
+            self._queue.put_nowait((time.monotonic() - self._start_monotonic,
+                                    frame, *bbox, confidence, state, dx, dy))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _write_pending(self, first) -> None:
+        records = [first]
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        while self.count + len(records) > self._capacity:
+            self._grow()
+        self._map[self.count:self.count + len(records)] = np.array(records, dtype=RECORD_DTYPE)
+        self.count += len(records)
+
+    def _write_count(self) -> None:
+        self._map.flush()
+        with open(self.path, "r+b") as f:
+            f.write(self._header())
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while self.running or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                first = None
+            if first is not None:
+                self._write_pending(first)
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._write_count()
+                last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Write the remaining records and trim the file to its contents."""
+        self.running = False
+        self._thread.join()
+        self._write_count()
+        del self._map
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+        logger.info(f"Telemetry: {self.count} records written to {self.path}"
+                    f"{f', {self.dropped} dropped' if self.dropped else ''}")
+
+
+class TelemetryLog:
+    """Read-only, memory-mapped view of a telemetry log."""
+
+    def __init__(self, path: str):
+        """Open a telemetry log.
+
+        Args:
+            path: Log file written by TelemetryWriter
+        """
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < struct.calcsize(HEADER_FORMAT):
+            raise ValueError(f"{path}: file too short for a telemetry header")
+        magic, version, record_size, count, start_time = struct.unpack_from(HEADER_FORMAT, header)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path}: not a version {VERSION} telemetry log")
+
+        # The header count lags the data by up to one flush interval after a
+        # crash; trailing zeroed records (timestamp 0) are never valid, as
+        # every record is logged some time after the session start.
+        capacity = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self.path = path
+        self.start_time = start_time
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                                 offset=HEADER_SIZE, shape=(capacity,)) if capacity else \
+            np.zeros(0, dtype=RECORD_DTYPE)
+        if capacity > count:
+            tail = self.records[count:]
+            count += int(np.count_nonzero(tail["timestamp"] > 0))
+        self.records = self.records[:count]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def time_slice(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Return the records between two times in seconds since session start.
+
+        Args:
+            start: First second to include (default: beginning)
+            end: Second to stop before (default: end)
+
+        Returns:
+            np.ndarray: Structured array view of RECORD_DTYPE
+        """
+        times = self.records["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(times, start))
+        hi = len(times) if end is None else int(np.searchsorted(times, end))
+        return self.records[lo:hi]
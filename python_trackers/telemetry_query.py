@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Telemetry query tool
+
+Slice, aggregate and plot telemetry logs written by object_tracker.py
+--telemetry. Logs are memory-mapped and processed with vectorized numpy,
+so multi-hour sessions only touch the range being queried.
+
+Examples:
+    python telemetry_query.py info session.tlm
+    python telemetry_query.py slice session.tlm --start 60 --end 90 -o minute.csv
+    python telemetry_query.py aggregate session.tlm --bucket 10
+    python telemetry_query.py plot session.tlm --start 600 -o track.png
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+
+from telemetry import TelemetryLog
+
+TRACKING = 1  # TrackingState.TRACKING
+
+
+def aggregate(records: np.ndarray, bucket: float) -> Dict[str, np.ndarray]:
+    """Summarize records in fixed-width time buckets from session start.
+
+    Args:
+        records: Structured array of RECORD_DTYPE, sorted by timestamp
+        bucket: Bucket width in seconds
+
+    Returns:
+        Dict[str, np.ndarray]: Per-bucket columns
+    """
+    if len(records) == 0:
+        return {}
+    index = (records["timestamp"] // bucket).astype(np.int64)
+    # Records are time ordered, so each bucket is one contiguous run
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    counts = np.diff(np.r_[starts, len(records)])
+    tracking = (records["state"] == TRACKING).astype(np.float64)
+    abs_dx = np.abs(records["dx"].astype(np.int32))
+    abs_dy = np.abs(records["dy"].astype(np.int32))
+    return {
+        "t": index[starts] * bucket,
+        "frames": counts,
+        "fps": counts / bucket,
+        "tracking": np.add.reduceat(tracking, starts) / counts,
+        "mean_abs_dx": np.add.reduceat(abs_dx, starts) / counts,
+        "mean_abs_dy": np.add.reduceat(abs_dy, starts) / counts,
+        "max_abs_dx": np.maximum.reduceat(abs_dx, starts),
+        "max_abs_dy": np.maximum.reduceat(abs_dy, starts),
+    }
+
+
+def cmd_info(log: TelemetryLog, args) -> None:
+    records = log.records
+    print(f"File:      {log.path}")
+    print(f"Started:   {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(log.start_time))}")
+    print(f"Records:   {len(records)}")
+    if len(records) == 0:
+        return
+    duration = records["timestamp"][-1] - records["timestamp"][0]
+    print(f"Duration:  {duration:.1f} s")
+    print(f"Mean FPS:  {len(records) / duration if duration > 0 else 0.0:.2f}")
+    print(f"Tracking:  {np.mean(records['state'] == TRACKING) * 100:.1f} % of frames")
+    gaps = np.diff(records["timestamp"])
+    if len(gaps):
+        print(f"Frame gap: p50 {np.percentile(gaps, 50) * 1000:.1f} ms, "
+              f"p99 {np.percentile(gaps, 99) * 1000:.1f} ms, max {gaps.max() * 1000:.1f} ms")
+
+
+def cmd_slice(log: TelemetryLog, args) -> None:
+    records = log.time_slice(args.start, args.end)
+    names = records.dtype.names
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        out.write("t," + ",".join(names[1:]) + "\n")
+        columns = [records[n] for n in names]
+        np.savetxt(out, np.column_stack(columns), delimiter=",",
+                   fmt=["%.4f", "%d", "%.1f", "%.1f", "%.1f", "%.1f", "%.3f", "%d", "%d", "%d"])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_aggregate(log: TelemetryLog, args) -> None:
+    table = aggregate(log.time_slice(args.start, args.end), args.bucket)
+    if not table:
+        return
+    print(f"{'t':>8} {'frames':>7} {'fps':>6} {'track%':>7} "
+          f"{'|dx|':>6} {'|dy|':>6} {'max|dx|':>8} {'max|dy|':>8}")
+    for i in range(len(table["t"])):
+        print(f"{table['t'][i]:8.1f} {table['frames'][i]:7d} {table['fps'][i]:6.1f} "
+              f"{table['tracking'][i] * 100:7.1f} {table['mean_abs_dx'][i]:6.1f} "
+              f"{table['mean_abs_dy'][i]:6.1f} {table['max_abs_dx'][i]:8d} "
+              f"{table['max_abs_dy'][i]:8d}")
+
+
+def cmd_plot(log: TelemetryLog, args) -> None:
+    try:
+        import matplotlib
+        if args.output:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("Plotting requires matplotlib (pip install matplotlib)")
+        sys.exit(1)
+
+    records = log.time_slice(args.start, args.end)
+    if len(records) == 0:
+        print("No records in range")
+        return
+    # Keep plots responsive on long sessions by plotting at most ~max_points samples
+    step = max(1, len(records) // args.max_points)
+    records = records[::step]
+    t = records["timestamp"]
+    center_x = records["x"] + records["w"] / 2
+    center_y = records["y"] + records["h"] / 2
+
+    fig, axes = plt.subplots(3, 1, sharex=True, figsize=(12, 8))
+    axes[0].plot(t, center_x, label="center x")
+    axes[0].plot(t, center_y, label="center y")
+    axes[0].set_ylabel("pixels")
+    axes[1].plot(t, records["dx"], label="dx")
+    axes[1].plot(t, records["dy"], label="dy")
+    axes[1].set_ylabel("command")
+    axes[2].plot(t[1:], np.diff(records["timestamp"]) * 1000 / step, label="frame time")
+    axes[2].set_ylabel("ms")
+    axes[2].set_xlabel("seconds since start")
+    for ax in axes:
+        ax.legend(loc="upper right")
+        ax.grid(True)
+    fig.tight_layout()
+    if args.output:
+        fig.savefig(args.output)
+    else:
+        plt.show()
+
+
+def parse_arguments():
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Query NeoVisionAim telemetry logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, func, help_text):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("log", type=str, help="telemetry log file")
+        p.add_argument("--start", type=float, default=None,
+                       help="first second since session start to include")
+        p.add_argument("--end", type=float, default=None,
+                       help="second since session start to stop before")
+        p.set_defaults(func=func)
+        return p
+
+    add_command("info", cmd_info, "show session summary")
+    p = add_command("slice", cmd_slice, "export records as CSV")
+    p.add_argument("-o", "--output", type=str, default=None, help="CSV file (default: stdout)")
+    p = add_command("aggregate", cmd_aggregate, "summarize per time bucket")
+    p.add_argument("--bucket", type=float, default=1.0, help="bucket width in seconds (default: 1)")
+    p = add_command("plot", cmd_plot, "plot trajectory, commands and frame time")
+    p.add_argument("-o", "--output", type=str, default=None, help="image file (default: show)")
+    p.add_argument("--max-points", type=int, default=20000,
+                   help="maximum samples plotted (default: 20000)")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the query tool."""
+    args = parse_arguments()
+    try:
+        log = TelemetryLog(args.log)
+    except (OSError, ValueError) as e:
+        print(f"Cannot open telemetry log: {e}")
+        sys.exit(1)
+    args.func(log, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+NeoVisionAim - Tracker registry
+
+Resolves OpenCV tracker factories lazily, on first use, so importing the
+tracking modules never touches trackers this OpenCV build lacks. Builds
+from 4.5 on keep BOOSTING, TLD, MedianFlow and MOSSE under ``cv2.legacy``
+(with opencv-contrib) or drop them; each name lists the places it may
+live and the first one found wins.
+
+Third-party trackers are picked up from the ``neovisionaim.trackers``
+entry point group. The entry point name is the tracker name and it must
+load a zero-argument callable returning an object with OpenCV's
+``init(frame, bbox)`` / ``update(frame) -> (ok, bbox)`` interface, e.g.
+in a plugin's pyproject.toml:
+
+    [project.entry-points."neovisionaim.trackers"]
+    siamese = "my_plugin.trackers:create_siamese"
+
+A few instances of each tracker used are constructed ahead of time in
+the background, so re-locking does not pay for construction (GOTURN
+loads its model on construction).
+
+Run this module to list the trackers available in this build and time
+import, construction and first lock.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "neovisionaim.trackers"
+
+# Candidate cv2 attribute paths per tracker, in order of preference
+BUILTIN_TRACKERS: Dict[str, Tuple[str, ...]] = {
+    "csrt": ("TrackerCSRT_create", "legacy.TrackerCSRT_create"),
+    "kcf": ("TrackerKCF_create", "legacy.TrackerKCF_create"),
+    "boosting": ("TrackerBoosting_create", "legacy.TrackerBoosting_create"),
+    "mil": ("TrackerMIL_create", "legacy.TrackerMIL_create"),
+    "tld": ("TrackerTLD_create", "legacy.TrackerTLD_create"),
+    "medianflow": ("TrackerMedianFlow_create", "legacy.TrackerMedianFlow_create"),
+    "mosse": ("TrackerMOSSE_create", "legacy.TrackerMOSSE_create"),
+    # Needs goturn.prototxt and goturn.caffemodel in the working directory
+    "goturn": ("TrackerGOTURN_create",),
+}
+
+TrackerFactory = Callable[[], Any]
+
+
+class TrackerUnavailableError(LookupError):
+    """Raised when a tracker is unknown or missing from this OpenCV build."""
+
+
+def _resolve_cv2(paths: Tuple[str, ...]) -> Optional[TrackerFactory]:
+    """Return the first cv2 attribute found among ``paths``."""
+    import cv2
+    for path in paths:
+        obj = cv2
+        for part in path.split("."):
+            obj = getattr(obj, part, None)
+            if obj is None:
+                break
+        if obj is not None:
+            return obj
+    return None
+
+
+def _entry_points() -> Dict[str, Any]:
+    """Return the tracker entry points by name."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return {}
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    return {ep.name: ep for ep in eps}
+
+
+class TrackerRegistry:
+    """Lazily resolved tracker factories with a pool of prebuilt instances."""
+
+    def __init__(self, spares: int = 1):
+        """Initialize the registry; nothing is resolved until first use.
+
+        Args:
+            spares: Instances of each used tracker kept constructed ahead of time
+        """
+        self.spares = spares
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._custom: Dict[str, TrackerFactory] = {}
+        self._factories: Dict[str, Optional[TrackerFactory]] = {}
+        self._plugins: Optional[Dict[str, Any]] = None
+        self._pool: Dict[str, List[Any]] = {}
+        self._refilling: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _plugin_entry_points(self) -> Dict[str, Any]:
+        if self._plugins is None:
+            try:
+                self._plugins = _entry_points()
+            except Exception as e:
+                logger.warning(f"Failed to list tracker plugins: {e}")
+                self._plugins = {}
+        return self._plugins
+
+    def register(self, name: str, factory: TrackerFactory) -> None:
+        """Register a tracker factory under ``name``, replacing any other."""
+        with self._lock:
+            self._custom[name] = factory
+            self._factories.pop(name, None)
+            self._pool.pop(name, None)
+
+    def names(self) -> List[str]:
+        """Return every known tracker name, available in this build or not."""
+        names = set(BUILTIN_TRACKERS) | set(self._custom) | set(self._plugin_entry_points())
+        return sorted(names)
+
+    def factory(self, name: str) -> TrackerFactory:
+        """Resolve the factory for a tracker, once.
+
+        Raises:
+            TrackerUnavailableError: If the tracker is unknown or unavailable
+        """
+        with self._lock:
+            if name not in self._factories:
+                start = time.perf_counter()
+                self._factories[name] = self._resolve(name)
+                self.timings.setdefault(name, {})["resolve_ms"] = \
+                    (time.perf_counter() - start) * 1000.0
+            factory = self._factories[name]
+        if factory is None:
+            raise TrackerUnavailableError(f"tracker '{name}' is not available in this build")
+        return factory
+
+    def _resolve(self, name: str) -> Optional[TrackerFactory]:
+        if name in self._custom:
+            return self._custom[name]
+        plugin = self._plugin_entry_points().get(name)
+        if plugin is not None:
+            try:
+                return plugin.load()
+            except Exception as e:
+                logger.warning(f"Failed to load tracker plugin '{name}': {e}")
+                return None
+        if name in BUILTIN_TRACKERS:
+            return _resolve_cv2(BUILTIN_TRACKERS[name])
+        return None
+
+    def is_available(self, name: str, construct: bool = False) -> bool:
+        """Return whether a tracker can be used.
+
+        Args:
+            name: Tracker name
+            construct: Also build an instance, which catches trackers whose
+                factory exists but fails (e.g. GOTURN without its model files);
+                it is kept as a spare, and a pooled spare counts as proof
+        """
+        try:
+            factory = self.factory(name)
+            with self._lock:
+                proven = bool(self._pool.get(name))
+            if construct and not proven:
+                self._put_spare(name, self._construct(name, factory))
+        except Exception:
+            return False
+        return True
+
+    def available(self, construct: bool = False) -> List[str]:
+        """Return the names of the trackers usable in this build."""
+        return [name for name in self.names() if self.is_available(name, construct)]
+
+    def _construct(self, name: str, factory: TrackerFactory) -> Any:
+        start = time.perf_counter()
+        tracker = factory()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        timings = self.timings.setdefault(name, {})
+        timings.setdefault("first_construct_ms", elapsed)
+        timings["construct_ms"] = elapsed
+        return tracker
+
+    def _put_spare(self, name: str, tracker: Any) -> None:
+        with self._lock:
+            pool = self._pool.setdefault(name, [])
+            if len(pool) < self.spares:
+                pool.append(tracker)
+
+    def _refill(self, name: str, factory: TrackerFactory) -> None:
+        """Build spares until the pool is full; one refill runs per name at a time."""
+        try:
+            while True:
+                with self._lock:
+                    if len(self._pool.get(name, [])) >= self.spares:
+                        self._refilling.discard(name)
+                        return
+                self._put_spare(name, self._construct(name, factory))
+        except Exception as e:
+            logger.debug(f"Could not prebuild tracker '{name}': {e}")
+            with self._lock:
+                self._refilling.discard(name)
+
+    def create(self, name: str) -> Any:
+        """Return a fresh tracker instance, from the prebuilt pool if possible.
+
+        Raises:
+            TrackerUnavailableError: If the tracker is unknown or unavailable
+        """
+        factory = self.factory(name)
+        with self._lock:
+            pool = self._pool.setdefault(name, [])
+            tracker = pool.pop() if pool else None
+            refill = len(pool) < self.spares and name not in self._refilling
+            if refill:
+                self._refilling.add(name)
+        if tracker is None:
+            tracker = self._construct(name, factory)
+        if refill:
+            refill = threading.Thread(target=self._refill, args=(name, factory))
+            refill.daemon = True
+            refill.start()
+        return tracker
+
+    def __getitem__(self, name: str) -> TrackerFactory:
+        """Return a zero-argument callable creating the tracker, like the old dicts."""
+        self.factory(name)
+        return lambda: self.create(name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.is_available(name)
+
+
+# Shared registry used by the tracking scripts
+TRACKERS = TrackerRegistry()
+
+
+def main():
+    """Report available trackers with import, construction and first-lock times."""
+    import argparse
+    parser = argparse.ArgumentParser(description="List and time the available trackers")
+    parser.add_argument("--size", type=int, nargs=2, default=[640, 480],
+                        metavar=("WIDTH", "HEIGHT"), help="test frame size (default: 640 480)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    import cv2
+    import numpy as np
+    print(f"OpenCV {cv2.__version__}, import {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    width, height = args.size
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    bbox = (width // 2 - 40, height // 2 - 40, 80, 80)
+    shifted = np.roll(frame, 2, axis=1)
+
+    registry = TrackerRegistry(spares=0)
+    print(f"{'tracker':<12} {'resolve ms':>10} {'create ms':>10} {'first lock ms':>14}")
+    for name in registry.names():
+        try:
+            tracker = registry.create(name)
+        except Exception as e:
+            print(f"{name:<12} unavailable ({str(e).splitlines()[0][:60]})")
+            continue
+        start = time.perf_counter()
+        tracker.init(frame, bbox)
+        tracker.update(shifted)
+        lock_ms = (time.perf_counter() - start) * 1000.0
+        timings = registry.timings[name]
+        print(f"{name:<12} {timings['resolve_ms']:10.2f} {timings['construct_ms']:10.2f} "
+              f"{lock_ms:14.2f}")
+
+
+if __name__ == "__main__":
+    main()